@@ -1,6 +1,5 @@
 """backup 命令：备份 Nekro Agent 数据。"""
 
-from datetime import datetime
 from pathlib import Path
 
 import click
@@ -37,16 +36,26 @@ def _render_event(event: ServiceEvent) -> None:
 )
 @click.option("--no-restart", is_flag=True, default=False, help="备份后不重启服务")
 @click.option("--name", default=None, help="备份名称标识（例如 pre-preview）")
+@click.option(
+    "--compress-level",
+    type=click.IntRange(1, 9),
+    default=6,
+    show_default=True,
+    help="gzip 压缩级别（1 最快，9 体积最小）",
+)
 def backup(
     ctx: click.Context,
     data_dir: str | None,
     output: str | None,
     no_restart: bool,
     name: str | None,
+    compress_level: int,
 ) -> None:
     """备份 Nekro Agent 数据和配置。"""
     _ = ctx.ensure_object(dict)
-    ctx.obj["data_dir"] = data_dir
+    # 只解析一次数据目录，子命令直接复用
+    data_dir_path = Path(data_dir or default_data_dir()).expanduser().resolve()
+    ctx.obj["data_dir"] = data_dir_path
 
     if ctx.invoked_subcommand is not None:
         return
@@ -54,10 +63,11 @@ def backup(
     try:
         result = BackupService().run(
             BackupRequest(
-                data_dir=Path(data_dir).expanduser().resolve() if data_dir else None,
+                data_dir=data_dir_path,
                 output=Path(output).expanduser().resolve() if output else None,
                 no_restart=no_restart,
                 name=name,
+                compress_level=compress_level,
             ),
             _render_event,
         )
@@ -90,8 +100,9 @@ def list_backups(
 ) -> None:
     """列出可用的备份文件。"""
     obj = ctx.ensure_object(dict)
-    data_dir: str | None = obj.get("data_dir")
-    data_dir_path = Path(data_dir or default_data_dir()).expanduser().resolve()
+    data_dir_path: Path | None = obj.get("data_dir")
+    if data_dir_path is None:
+        data_dir_path = Path(default_data_dir()).expanduser().resolve()
     backups = BackupService().list_backups(
         data_dir_path,
         name=filter_name,
@@ -113,13 +124,13 @@ def list_backups(
     filter_text = f"（{', '.join(filters)}）" if filters else ""
 
     info(f"发现以下历史备份{filter_text}：")
+    lines: list[str] = []
     for i, backup_summary in enumerate(backups, 1):
-        mtime = datetime.fromtimestamp(
-            backup_summary.path.stat().st_mtime
-        ).strftime("%Y-%m-%d %H:%M:%S")
+        mtime = backup_summary.created_at.strftime("%Y-%m-%d %H:%M:%S")
         name_str = f", 名称: {backup_summary.name}" if backup_summary.name else ""
-        console.print(
+        lines.append(
             f"  [{i}] {backup_summary.path.name} "
             f"(备份时间: {mtime}{name_str}, "
             f"大小: {backup_summary.size_bytes / 1024 / 1024:.1f} MB)"
         )
+    console.print("\n".join(lines))
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import os
 import socket
 from pathlib import Path
 
@@ -17,7 +18,6 @@ from ..daemon import (
     DEFAULT_SOCKS_BIND_HOST,
     DEFAULT_SOCKS_BIND_PORT,
 )
-from ..daemon.app import create_app
 from ..daemon.socks import resolve_default_socks_bind_host
 from ..utils.console import error, info, success, warning
 from ..utils.privilege import with_sudo_fallback
@@ -54,8 +54,9 @@ def start(
 
     import uvicorn
 
+    from ..daemon.app import create_app
+
     # 设置环境变量，告知 with_sudo_fallback 当前处于 daemon 模式
-    import os
     os.environ["NA_TOOLS_DAEMON_MODE"] = "1"
 
     resolved_data_dir = Path(data_dir or default_data_dir()).expanduser().resolve()
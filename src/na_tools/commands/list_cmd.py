@@ -16,14 +16,16 @@ def list_cmd() -> None:
         console.print("暂无安装记录。")
         return
 
+    lines: list[str] = []
     for entry in entries:
         marker = "*" if entry.is_current else " "
         last_used_str = entry.last_used.strftime("%Y-%m-%d %H:%M:%S") if entry.last_used else "-"
         color = "green" if entry.is_current else "white"
-        console.print(
+        lines.append(
             f"[{color}]{marker} [{entry.index}] {entry.path} "
             f"(最后使用: {last_used_str})[/{color}]"
         )
+    console.print("\n".join(lines))
 
     if not has_current:
         console.print(
@@ -27,7 +27,7 @@ def logs(service: str, data_dir: str | None, follow: bool, tail: int) -> None:
     try:
         InstanceService().logs(
             service,
-            data_dir=Path(data_dir).expanduser().resolve() if data_dir else None,
+            data_dir=Path(data_dir) if data_dir else None,
             follow=follow,
             tail=tail,
         )
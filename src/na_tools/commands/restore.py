@@ -1,6 +1,6 @@
 """restore 命令：从备份恢复 Nekro Agent 数据。"""
 
-from datetime import datetime
+import os
 from pathlib import Path
 
 import click
@@ -33,7 +33,7 @@ def restore(backup_file: str | None, data_dir: str | None) -> None:
     data_dir_path = Path(data_dir or default_data_dir()).expanduser().resolve()
     backup_path = _select_backup_file(backup_file, data_dir_path)
 
-    if data_dir_path.exists() and any(data_dir_path.iterdir()):
+    if _dir_has_entries(data_dir_path):
         warning(f"目标目录非空: {data_dir_path}")
         if not confirm("是否覆盖现有数据?"):
             raise click.Abort()
@@ -55,6 +55,15 @@ def restore(backup_file: str | None, data_dir: str | None) -> None:
     success("🎉 恢复完成!")
 
 
+def _dir_has_entries(path: Path) -> bool:
+    """目录存在且非空。scandir 读到第一个目录项即返回，不构造 Path 对象。"""
+    try:
+        with os.scandir(path) as it:
+            return next(it, None) is not None
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
 def _select_backup_file(backup_file: str | None, data_dir_path: Path) -> Path:
     if backup_file:
         return Path(backup_file).expanduser().resolve()
@@ -72,16 +81,16 @@ def _select_backup_file(backup_file: str | None, data_dir_path: Path) -> Path:
         raise click.Abort()
 
     info("发现以下历史备份：")
+    lines: list[str] = []
     for i, backup_summary in enumerate(backups, 1):
-        mtime = datetime.fromtimestamp(
-            backup_summary.path.stat().st_mtime
-        ).strftime("%Y-%m-%d %H:%M:%S")
+        mtime = backup_summary.created_at.strftime("%Y-%m-%d %H:%M:%S")
         name_str = f", 名称: {backup_summary.name}" if backup_summary.name else ""
-        console.print(
+        lines.append(
             f"  [{i}] {backup_summary.path.name} "
             f"(备份时间: {mtime}{name_str}, "
             f"大小: {backup_summary.size_bytes / 1024 / 1024:.1f} MB)"
         )
+    console.print("\n".join(lines))
 
     choice_val = int(click.prompt("\n请选择要恢复的备份序号", type=int))
     if choice_val < 1 or choice_val > len(backups):
@@ -15,9 +15,7 @@ from ..utils.privilege import with_sudo_fallback
 def status(data_dir: str | None) -> None:
     """查看 Nekro Agent 服务状态。"""
     try:
-        result = InstanceService().status(
-            Path(data_dir).expanduser().resolve() if data_dir else None
-        )
+        result = InstanceService().status(Path(data_dir) if data_dir else None)
     except InstanceServiceError as exc:
         error(exc.message)
         raise click.Abort() from exc
@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import os
-from typing import TYPE_CHECKING, cast
+import re
+import shutil
+import tempfile
+from typing import IO, TYPE_CHECKING, cast
 from pathlib import Path
 
 from ..utils.console import info, success, confirm, prompt
-from ..utils.network import download_file
+from ..utils.network import download_many
+from .config import ENV_EXAMPLE_FILENAME, load_env, save_env
+from .platform import run_cmd
 
 if TYPE_CHECKING:
     from .docker import DockerEnv
@@ -23,6 +28,12 @@ SERVICE_QDRANT = "nekro_qdrant"
 SERVICE_NAPCAT = "nekro_napcat"
 ALL_SERVICES = {SERVICE_AGENT, SERVICE_POSTGRES, SERVICE_QDRANT, SERVICE_NAPCAT}
 
+# compose 中的 image 行：缩进 + "image:" + 可选引号包裹的镜像名
+_IMAGE_LINE_RE = re.compile(
+    r"""^(?P<head>[ \t]*image:[ \t]*)(?P<quote>["']?)(?P<image>[^\s"'#]+)(?P=quote)""",
+    re.MULTILINE,
+)
+
 # 需要备份/恢复的服务卷映射: 服务名 -> (容器内挂载路径, 备份文件名)
 VOLUME_BACKUP_TARGETS: dict[str, tuple[str, str]] = {
     SERVICE_POSTGRES: ("/var/lib/postgresql/data", "postgres.tar.gz"),
@@ -30,20 +41,33 @@ VOLUME_BACKUP_TARGETS: dict[str, tuple[str, str]] = {
 }
 
 
-def download_compose(data_dir: Path, *, with_napcat: bool = False) -> bool:
+def download_compose(
+    data_dir: Path,
+    *,
+    with_napcat: bool = False,
+    with_env_example: bool = False,
+    output: Path | None = None,
+) -> bool:
     """下载对应的 docker-compose.yml 到数据目录。
 
     Args:
         data_dir: 数据目录。
         with_napcat: 是否下载含 NapCat 的版本。
+        with_env_example: 是否同时并发下载 .env.example 模板。
+            模板下载失败不影响返回值，由 ``setup_env`` 自行重试。
+        output: compose 文件的保存路径，默认为数据目录下的 docker-compose.yml。
     """
     remote_file = COMPOSE_NAPCAT_FILE if with_napcat else COMPOSE_FILE
-    local_path = data_dir / COMPOSE_FILE
+    local_path = output or data_dir / COMPOSE_FILE
 
     if with_napcat:
         info("将同时运行 NapCat 服务")
 
-    if download_file(remote_file, local_path):
+    files = [(remote_file, local_path)]
+    if with_env_example:
+        files.append((ENV_EXAMPLE_FILENAME, data_dir / ENV_EXAMPLE_FILENAME))
+
+    if download_many(files)[remote_file]:
         success(f"docker-compose.yml 已下载到: {local_path}")
         return True
     return False
@@ -54,98 +78,143 @@ def compose_exists(data_dir: Path) -> bool:
     return (data_dir / COMPOSE_FILE).exists()
 
 
+def _yaml_load(stream: IO[str]) -> object:
+    """使用 libyaml (CSafeLoader) 解析 YAML，不可用时回退到纯 Python 实现。"""
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return cast(object, yaml.load(stream, Loader=loader))
+
+
 def list_compose_services(data_dir: Path) -> set[str]:
     """Return service names declared in docker-compose.yml."""
-    compose_path = data_dir / COMPOSE_FILE
-    if not compose_path.exists():
+    data = _load_compose(data_dir / COMPOSE_FILE)
+    if data is None:
         return set()
+    return {str(name) for name in _compose_services(data)}
 
-    import yaml
+
+def _load_compose(compose_path: Path) -> dict[str, object] | None:
+    """读取 docker-compose.yml；文件不存在或缺少 services 映射时返回 None。"""
+    if not compose_path.exists():
+        return None
 
     with open(compose_path, encoding="utf-8") as f:
-        content = yaml.safe_load(f)
+        content = _yaml_load(f)
 
-    if not isinstance(content, dict):
-        return set()
-    services = content.get("services")
-    if not isinstance(services, dict):
-        return set()
-    return {str(name) for name in services}
+    if not isinstance(content, dict) or not isinstance(content.get("services"), dict):
+        return None
+    return cast(dict[str, object], content)
 
 
-def apply_mirror_to_compose(data_dir: Path, mirror: str) -> None:
-    """将镜像站应用到 docker-compose.yml 中的所有服务。
+def _compose_services(data: dict[str, object]) -> dict[str, dict[str, object]]:
+    return cast(dict[str, dict[str, object]], data["services"])
 
-    Args:
-        data_dir: 数据目录。
-        mirror: 镜像站地址 (e.g. docker.1ms.run)。
+
+def _save_compose(compose_path: Path, text: str) -> None:
+    """原子写回 docker-compose.yml，避免中途失败留下半截文件。
+
+    mkstemp 创建的文件权限为 0600、属主为当前用户，替换前需沿用原文件的权限与属主。
     """
-    if not mirror:
-        return
+    st = os.stat(compose_path)
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=compose_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
+            _ = f.write(text)
+        shutil.copymode(compose_path, tmp_path)
+        if hasattr(os, "chown"):
+            try:
+                os.chown(tmp_path, st.st_uid, st.st_gid)
+            except PermissionError:
+                # 非 root 无法改为他人属主，保留当前用户即可
+                pass
+        os.replace(tmp_path, compose_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
 
-    # 去除协议头和尾部斜杠
-    mirror = mirror.replace("https://", "").replace("http://", "").rstrip("/")
 
-    import yaml
+def update_compose_images(
+    data_dir: Path,
+    *,
+    mirror: str = "",
+    image_tag: tuple[str, str] | None = None,
+) -> bool:
+    """一次读写完成镜像站前缀与镜像 tag 的修改。
+
+    直接在原文上替换 ``image:`` 行，无需 YAML 解析/序列化，并保留注释与格式。
+
+    Args:
+        data_dir: 数据目录。
+        mirror: 镜像站地址，为空时不添加前缀。
+        image_tag: (镜像前缀, 目标 tag)，为 None 时不修改 tag。
 
+    Returns:
+        指定 image_tag 时返回是否匹配到服务；未指定时返回 True。
+    """
     compose_path = data_dir / COMPOSE_FILE
     if not compose_path.exists():
-        return
-
-    with open(compose_path, encoding="utf-8") as f:
-        content = yaml.safe_load(f)  # pyright: ignore[reportAny]
+        return image_tag is None
+
+    mirror = _normalize_mirror(mirror)
+    matched = image_tag is None
+    mirrored = False
+
+    def rewrite(match: re.Match[str]) -> str:
+        nonlocal matched, mirrored
+        image = match["image"]
+        if mirror and not image.startswith(mirror):
+            new_image = _mirror_image(image, mirror)
+            info(f"  镜像: {image} -> {new_image}")
+            image = new_image
+            mirrored = True
+        if image_tag is not None and image_tag[0] in image:
+            matched = True
+            new_image = _retag_image(image, image_tag[1])
+            if new_image != image:
+                info(f"  镜像 tag 变更: {image} -> {new_image}")
+                image = new_image
+        return f"{match['head']}{match['quote']}{image}{match['quote']}"
+
+    text = compose_path.read_text(encoding="utf-8")
+    new_text = _IMAGE_LINE_RE.sub(rewrite, text)
+    if new_text != text:
+        _save_compose(compose_path, new_text)
+    if mirrored:
+        success(f"已更新 docker-compose.yml 使用镜像站: {mirror}")
+    return matched
 
-    if not isinstance(content, dict) or "services" not in content:
-        return
 
-    data = cast(dict[str, object], content)
-    services_data = data["services"]
+def apply_mirror_to_compose(data_dir: Path, mirror: str) -> None:
+    """将镜像站应用到 docker-compose.yml 中的所有服务。
 
-    if not isinstance(services_data, dict):
+    Args:
+        data_dir: 数据目录。
+        mirror: 镜像站地址 (e.g. docker.1ms.run)。
+    """
+    if not mirror:
         return
+    _ = update_compose_images(data_dir, mirror=mirror)
 
-    services = cast(dict[str, dict[str, object]], services_data)
-    modified = False
-
-    for service_name, service_config in services.items():
-        if "image" in service_config:
-            image = service_config["image"]
-            if not isinstance(image, str):
-                continue
 
-            # 避免重复添加
-            if not image.startswith(mirror):
-                # 处理已经有域名的镜像 (e.g. ghcr.io/...)
-                # 简单策略：直接在该镜像前拼上 mirror
-                # 常见镜像站用法: mirror.com/library/image:tag  or mirror.com/image:tag
-                # 对于 ghcr.io/kro... 这种，有些镜像站支持 mirror.com/ghcr.io/kro...
-                # 或者有些是 mirror.com/kro...
-                # 这里采用最通用的: mirror/image_name
-
-                # 如果镜像本身包含 /，则认为是完整路径或者 namespace/image
-                # 如果镜像不包含 /，则是 library/image (Docker Hub)
+def _normalize_mirror(mirror: str) -> str:
+    # 去除协议头和尾部斜杠
+    return mirror.replace("https://", "").replace("http://", "").rstrip("/")
 
-                # 简单粗暴做法：mirror/image_original
 
-                new_image = f"{mirror}/{image}"
-                service_config["image"] = new_image
-                modified = True
-                info(f"  服务 {service_name}: {image} -> {new_image}")
+def _mirror_image(image: str, mirror: str) -> str:
+    # 处理已经有域名的镜像 (e.g. ghcr.io/...)
+    # 简单策略：直接在该镜像前拼上 mirror
+    # 常见镜像站用法: mirror.com/library/image:tag  or mirror.com/image:tag
+    # 对于 ghcr.io/kro... 这种，有些镜像站支持 mirror.com/ghcr.io/kro...
+    # 或者有些是 mirror.com/kro...
+    # 这里采用最通用的: mirror/image_name
 
-    if modified:
-        import tempfile
+    # 如果镜像本身包含 /，则认为是完整路径或者 namespace/image
+    # 如果镜像不包含 /，则是 library/image (Docker Hub)
 
-        tmp_fd, tmp_path = tempfile.mkstemp(
-            dir=compose_path.parent, suffix=".tmp"
-        )
-        try:
-            with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-                yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-            os.replace(tmp_path, compose_path)
-        except Exception:
-            os.unlink(tmp_path)
-            raise
-        success(f"已更新 docker-compose.yml 使用镜像站: {mirror}")
+    # 简单粗暴做法：mirror/image_original
+    return f"{mirror}/{image}"
 
 
 def patch_compose_isolation(data_dir: Path) -> None:
@@ -157,11 +226,6 @@ def patch_compose_isolation(data_dir: Path) -> None:
     Args:
         data_dir: 数据目录。
     """
-    import shutil
-
-    from .config import load_env, save_env
-    from .platform import run_cmd
-
     env_path = data_dir / ".env"
     env = load_env(env_path)
 
@@ -224,49 +288,15 @@ def set_image_tag(data_dir: Path, image_prefix: str, tag: str) -> bool:
     Returns:
         是否成功修改。
     """
-    import yaml
+    return update_compose_images(data_dir, image_tag=(image_prefix, tag))
 
-    compose_path = data_dir / COMPOSE_FILE
-    if not compose_path.exists():
-        return False
-
-    with open(compose_path, encoding="utf-8") as f:
-        content = yaml.safe_load(f)
-
-    if not isinstance(content, dict) or "services" not in content:
-        return False
-
-    data = cast(dict[str, object], content)
-    services_data = data["services"]
-    if not isinstance(services_data, dict):
-        return False
-
-    services = cast(dict[str, dict[str, object]], services_data)
-    matched = False
-    modified = False
-
-    for service_config in services.values():
-        image = service_config.get("image")
-        if not isinstance(image, str):
-            continue
-        # 匹配：image_prefix 可能带镜像站前缀
-        # 例如 "docker.1ms.run/kromiose/nekro-agent:latest" 包含 "kromiose/nekro-agent"
-        if image_prefix not in image:
-            continue
-        matched = True
-        # 替换 tag：取 : 前的部分，拼接新 tag
-        base = image.rsplit(":", 1)[0]
-        new_image = f"{base}:{tag}"
-        if new_image != image:
-            service_config["image"] = new_image
-            info(f"  镜像 tag 变更: {image} -> {new_image}")
-            modified = True
-
-    if modified:
-        with open(compose_path, "w", encoding="utf-8") as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
 
-    return matched
+def _retag_image(image: str, tag: str) -> str:
+    # 替换 tag：取 : 前的部分，拼接新 tag
+    # image_prefix 可能带镜像站前缀
+    # 例如 "docker.1ms.run/kromiose/nekro-agent:latest" 包含 "kromiose/nekro-agent"
+    base = image.rsplit(":", 1)[0]
+    return f"{base}:{tag}"
 
 
 def resolve_service_volumes(
@@ -286,16 +316,20 @@ def resolve_service_volumes(
         return []
 
     services = cast(dict[str, dict[str, object]], config["services"])
-    result: list[tuple[str, str]] = []
+    targets = {
+        svc_name: target
+        for svc_name, target in VOLUME_BACKUP_TARGETS.items()
+        if svc_name in services
+    }
 
-    for svc_name, (mount_path, filename) in VOLUME_BACKUP_TARGETS.items():
-        if svc_name not in services:
-            continue
+    # 优先通过 docker inspect 批量解析
+    mounted = docker.get_service_volumes(
+        cwd=data_dir, services=list(targets), env_file=env_file,
+    )
 
-        # 优先通过 docker inspect 解析
-        volume_name = docker.get_service_volume(
-            cwd=data_dir, service=svc_name, target=mount_path, env_file=env_file,
-        )
+    result: list[tuple[str, str]] = []
+    for svc_name, (mount_path, filename) in targets.items():
+        volume_name = mounted.get(svc_name, {}).get(mount_path)
 
         # 回退到 compose config 静态解析
         if not volume_name:
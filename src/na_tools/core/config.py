@@ -1,5 +1,8 @@
 """.env 配置文件管理。"""
 
+import functools
+import re
+import shutil
 from pathlib import Path
 
 
@@ -10,50 +13,69 @@ from ..utils.network import download_file
 
 ENV_EXAMPLE_FILENAME = ".env.example"
 
+# .env 中的 KEY=VALUE 行：忽略空行、注释行和不含 "=" 的行，key/value 去除首尾空白
+_ENV_LINE_RE = re.compile(
+    r"^[^\S\n]*((?:[^\s#=][^=\n]*?)?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$",
+    re.MULTILINE,
+)
+
 
 def load_env(env_path: Path) -> dict[str, str]:
     """解析 .env 文件为字典。忽略注释和空行。"""
-    result: dict[str, str] = {}
-    if not env_path.exists():
-        return result
-    for line in env_path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" not in line:
-            continue
-        key, _, value = line.partition("=")
-        result[key.strip()] = value.strip()
-    return result
+    try:
+        stat = env_path.stat()
+    except FileNotFoundError:
+        return {}
+
+    # 缓存的是共享对象，返回副本避免调用方修改污染缓存
+    return dict(_parse_env(env_path, stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_env(env_path: Path, mtime_ns: int, size: int) -> dict[str, str]:
+    """解析 .env 文件；以 (路径, mtime, 大小) 为键缓存，文件变化后自动失效。"""
+    # 按字节读取再解码，跳过 TextIOWrapper；正则只认 \n，先按 splitlines 的全部行分隔符
+    # （\r、\x0b、\x0c、\x1c-\x1e、\x85、\u2028、\u2029）统一换行，与逐行解析保持一致
+    text = "\n".join(env_path.read_bytes().decode("utf-8").splitlines())
+    return {match[1]: match[2] for match in _ENV_LINE_RE.finditer(text)}
 
 
 def save_env(env_path: Path, data: dict[str, str]) -> None:
     """将字典写入 .env 文件。保留原有注释行。"""
-    lines: list[str] = []
+    current = load_env(env_path)
+    if data.items() <= current.items():
+        return
+    if current.keys().isdisjoint(data):
+        _append_env(env_path, data)
+        return
+
+    lines = env_path.read_bytes().decode("utf-8").splitlines() if env_path.exists() else []
     written_keys: set[str] = set()
-
-    if env_path.exists():
-        for line in env_path.read_text(encoding="utf-8").splitlines():
-            stripped = line.strip()
-            if stripped.startswith("#") or not stripped:
-                lines.append(line)
-                continue
-            if "=" in stripped:
-                key = stripped.split("=", 1)[0].strip()
-                if key in data:
-                    lines.append(f"{key}={data[key]}")
-                    written_keys.add(key)
-                else:
-                    lines.append(line)
-            else:
-                lines.append(line)
+    # 原地替换已有 key 所在行，注释、空行和无法解析的行保持不变
+    for index, line in enumerate(lines):
+        match = _ENV_LINE_RE.match(line)
+        if match is not None and match[1] in data:
+            key = match[1]
+            lines[index] = f"{key}={data[key]}"
+            written_keys.add(key)
 
     # 追加新的 key
-    for key, value in data.items():
-        if key not in written_keys:
-            lines.append(f"{key}={value}")
+    lines.extend(f"{key}={value}" for key, value in data.items() if key not in written_keys)
+
+    _ = env_path.write_bytes(("\n".join(lines) + "\n").encode("utf-8"))
+    _parse_env.cache_clear()
 
-    _ = env_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+def _append_env(env_path: Path, data: dict[str, str]) -> None:
+    """仅有新增 key 时直接追加写入，无需重写整个文件。"""
+    with open(env_path, "a+b") as f:
+        text = "".join(f"{key}={value}\n" for key, value in data.items())
+        if f.tell() > 0:
+            _ = f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                text = "\n" + text
+        _ = f.write(text.encode("utf-8"))
+    _parse_env.cache_clear()
 
 
 def get_container_name(service: str, env: dict[str, str]) -> str:
@@ -115,8 +137,6 @@ def setup_env(
             if not download_env_example(data_dir):
                 raise RuntimeError("无法下载 .env.example")
 
-        import shutil
-
         _ = shutil.copy(example_path, env_path)
         info(f"已创建 .env 文件: {env_path}")
 
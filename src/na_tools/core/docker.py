@@ -1,16 +1,18 @@
 """Docker / Docker Compose 环境检测与操作。"""
 
+import functools
 import json
 import os
 import shutil
 import subprocess
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Literal
+from typing import IO, Literal
 
 
 from ..utils.console import confirm, error, info, prompt, success, warning
 from ..utils.privilege import is_permission_error
+from .config import load_env
 from .platform import is_macos, run_cmd
 
 DockerAccessErrorCode = Literal[
@@ -21,6 +23,8 @@ DockerAccessErrorCode = Literal[
 ]
 
 _DEFAULT_DOCKER_SOCKET = Path("/var/run/docker.sock")
+# 向容器标准输入写入数据时的分块大小
+_STDIN_CHUNK_SIZE = 1 << 20
 _DOCKER_ACCESS_MESSAGES: dict[DockerAccessErrorCode, str] = {
     "docker_unavailable": "Docker 或 Docker Compose 不可用。",
     "docker_not_running": "宿主 Docker 未运行或无法连接。",
@@ -31,27 +35,64 @@ _DOCKER_ACCESS_MESSAGES: dict[DockerAccessErrorCode, str] = {
 }
 
 
+def _version_output(cmd: list[str]) -> str:
+    """执行版本查询命令，失败时返回空字符串。"""
+    try:
+        return run_cmd(cmd, capture=True).stdout.strip()
+    except (subprocess.CalledProcessError, OSError):
+        return ""
+
+
 def _find_docker() -> str | None:
     """查找 docker 可执行文件路径。"""
-    return shutil.which("docker")
+    return _which("docker", os.environ.get("PATH"))
 
 
 def _detect_compose_cmd() -> list[str] | None:
     """检测可用的 Docker Compose 命令。
 
     优先使用 `docker compose`（V2 plugin），其次 `docker-compose`。
+    检测结果按 PATH 缓存，避免每次构造 DockerEnv 都启动一次子进程。
     """
-    docker = _find_docker()
+    cmd = _probe_compose_cmd(os.environ.get("PATH"))
+    if cmd is None:
+        _probe_compose_cmd.cache_clear()
+        return None
+    return list(cmd)
+
+
+def refresh_docker_detection() -> None:
+    """清除 docker / compose 检测缓存，例如在安装 Docker 之后。"""
+    _which_cached.cache_clear()
+    _probe_compose_cmd.cache_clear()
+
+
+def _which(name: str, path: str | None) -> str | None:
+    """按 PATH 缓存的 ``shutil.which``；未找到时不保留缓存，安装后可重新检测。"""
+    found = _which_cached(name, path)
+    if found is None:
+        _which_cached.cache_clear()
+    return found
+
+
+@functools.lru_cache(maxsize=8)
+def _which_cached(name: str, path: str | None) -> str | None:
+    return shutil.which(name, path=path)
+
+
+@functools.lru_cache(maxsize=4)
+def _probe_compose_cmd(path: str | None) -> tuple[str, ...] | None:
+    docker = _which("docker", path)
     if docker:
         try:
             _ = run_cmd([docker, "compose", "version"], capture=True, check=True)
-            return [docker, "compose"]
+            return (docker, "compose")
         except (subprocess.CalledProcessError, OSError):
             pass
 
-    dc = shutil.which("docker-compose")
+    dc = _which("docker-compose", path)
     if dc:
-        return [dc]
+        return (dc,)
 
     return None
 
@@ -69,6 +110,12 @@ class DockerEnv:
         self.docker_path: str | None = _find_docker()
         self.compose_cmd: list[str] | None = _detect_compose_cmd()
 
+    def refresh(self) -> None:
+        """清除检测缓存并重新检测 docker / compose，例如在安装 Docker 之后。"""
+        refresh_docker_detection()
+        self.docker_path = _find_docker()
+        self.compose_cmd = _detect_compose_cmd()
+
     @property
     def docker_installed(self) -> bool:
         return self.docker_path is not None
@@ -95,23 +142,28 @@ class DockerEnv:
         return None
 
     def print_status(self) -> None:
-        if self.docker_installed:
-            assert self.docker_path is not None
-            try:
-                result = run_cmd([self.docker_path, "--version"], capture=True)
-                success(f"Docker 已安装: {result.stdout.strip()}")
-            except (subprocess.CalledProcessError, OSError):
-                success("Docker 已安装")
+        # 两条版本查询互不依赖，并发执行以免串行等待两次进程启动
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            docker_version = (
+                executor.submit(_version_output, [self.docker_path, "--version"])
+                if self.docker_path is not None
+                else None
+            )
+            compose_version = (
+                executor.submit(_version_output, [*self.compose_cmd, "version"])
+                if self.compose_cmd is not None
+                else None
+            )
+
+        if docker_version is not None:
+            version = docker_version.result()
+            success(f"Docker 已安装: {version}" if version else "Docker 已安装")
         else:
             error("Docker 未安装")
 
-        if self.compose_installed:
-            assert self.compose_cmd is not None
-            try:
-                result = run_cmd([*self.compose_cmd, "version"], capture=True)
-                success(f"Docker Compose 已安装: {result.stdout.strip()}")
-            except (subprocess.CalledProcessError, OSError):
-                success("Docker Compose 已安装")
+        if compose_version is not None:
+            version = compose_version.result()
+            success(f"Docker Compose 已安装: {version}" if version else "Docker Compose 已安装")
         else:
             error("Docker Compose 未安装")
 
@@ -150,9 +202,7 @@ class DockerEnv:
                 error("Docker 安装失败，请手动安装后重试。")
                 return False
 
-            # 刷新检测
-            self.docker_path = _find_docker()
-            self.compose_cmd = _detect_compose_cmd()
+            self.refresh()
 
         return self.docker_installed and self.compose_installed
 
@@ -196,22 +246,17 @@ class DockerEnv:
             )
             return False
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".sh", delete=False) as f:
-            _ = f.write(script)
-            script_path = f.name
-
+        # 脚本经标准输入交给 sh，无需落盘临时文件
+        cmd = ["sudo", "sh", "-s"]
+        if mirror:
+            cmd.extend(["--", "--mirror", mirror])
         try:
-            cmd = ["sh", script_path]
-            if mirror:
-                cmd.extend(["--mirror", mirror])
-            _ = run_cmd(["sudo"] + cmd, check=True)
+            _ = run_cmd(cmd, check=True, input=script)
             success("Docker 安装成功!")
             return True
         except (subprocess.CalledProcessError, OSError) as e:
             error(f"Docker 安装失败: {e}")
             return False
-        finally:
-            Path(script_path).unlink(missing_ok=True)
 
     # --- Docker Compose 操作 ---
 
@@ -237,8 +282,6 @@ class DockerEnv:
         if env_file:
             cmd.extend(["--env-file", str(env_file)])
             # 读取 .env 中的 key，运行前从环境中移除，避免 shell 变量覆盖
-            from .config import load_env
-
             keys_to_unset = set(load_env(env_file).keys())
         cmd.extend(args)
 
@@ -392,6 +435,79 @@ class DockerEnv:
             error(f"容器运行失败: {e}")
             return False
 
+    def run_ephemeral_stdin(
+        self,
+        image: str,
+        cmd: list[str],
+        stdin: IO[bytes],
+        volumes: dict[str, str],
+    ) -> bool:
+        """运行一次性容器（--rm -i），并将数据流写入容器标准输入。
+
+        用于将归档直接交给容器内的 tar 解压，无需绑定挂载宿主机临时目录。
+
+        Args:
+            image: 镜像名。
+            cmd: 命令列表。
+            stdin: 写入容器标准输入的二进制流。
+            volumes: 挂载配置 {host_path_or_volume: container_path}。
+        """
+        if not self.docker_path:
+            return False
+
+        docker_cmd = [self.docker_path, "run", "--rm", "-i"]
+
+        for src, dst in volumes.items():
+            docker_cmd.extend(["-v", f"{src}:{dst}"])
+
+        docker_cmd.append(image)
+        docker_cmd.extend(cmd)
+
+        try:
+            proc = subprocess.Popen(docker_cmd, stdin=subprocess.PIPE)
+        except OSError as e:
+            if is_permission_error(e):
+                raise
+            error(f"容器运行失败: {e}")
+            return False
+
+        assert proc.stdin is not None
+        write_error: OSError | None = None
+        try:
+            try:
+                # 读取源数据流的异常（如备份归档损坏）不在此处理，直接向上抛出
+                while chunk := stdin.read(_STDIN_CHUNK_SIZE):
+                    try:
+                        _ = proc.stdin.write(chunk)
+                    except BrokenPipeError:
+                        # 容器提前退出，结果以退出码为准
+                        break
+                    except OSError as e:
+                        write_error = e
+                        break
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+            returncode = proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                _ = proc.wait()
+
+        try:
+            if write_error is not None:
+                raise write_error
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, docker_cmd)
+        except (subprocess.CalledProcessError, OSError) as e:
+            if is_permission_error(e):
+                raise
+            error(f"容器运行失败: {e}")
+            return False
+        return True
+
     def get_service_volume(
         self,
         cwd: Path,
@@ -400,39 +516,71 @@ class DockerEnv:
         env_file: Path | None = None,
     ) -> str | None:
         """获取服务指定挂载点的实际卷名。"""
+        mounts = self.get_service_volumes(cwd, [service], env_file=env_file)
+        return mounts.get(service, {}).get(target)
+
+    def get_service_volumes(
+        self,
+        cwd: Path,
+        services: list[str],
+        env_file: Path | None = None,
+    ) -> dict[str, dict[str, str]]:
+        """批量获取多个服务的命名卷挂载。
+
+        只执行一次 ``compose ps`` 和一次 ``docker inspect``。
+
+        Returns:
+            {服务名: {容器内挂载路径: 实际卷名}}，没有容器的服务不出现在结果中。
+        """
+        if not services:
+            return {}
+
         # 1. 获取容器 ID (包括停止的)
         res = self.compose(
             "ps",
             "-a",
             "-q",
-            service,
+            *services,
             cwd=cwd,
             env_file=env_file,
             capture=True,
             check=False,
         )
-        cid = res.stdout.strip()
-        if not cid:
-            return None
+        cids = res.stdout.split()
+        if not cids:
+            return {}
 
-        # 2. Inspect 容器
+        # 2. 一次 inspect 所有容器，每行输出 "<服务名> <Mounts JSON>"
         if not self.docker_path:
-            return None
+            return {}
 
+        result: dict[str, dict[str, str]] = {}
         try:
             res = run_cmd(
-                [self.docker_path, "inspect", "--format", "{{json .Mounts}}", cid],
+                [
+                    self.docker_path,
+                    "inspect",
+                    "--format",
+                    '{{index .Config.Labels "com.docker.compose.service"}} {{json .Mounts}}',
+                    *cids,
+                ],
                 capture=True,
             )
-            mounts: list[dict[str, str]] = json.loads(res.stdout)  # pyright: ignore[reportAny]
-            for m in mounts:
-                if m.get("Destination") == target and m.get("Type") == "volume":
-                    return m.get("Name")
+            for line in res.stdout.splitlines():
+                service, _, mounts_json = line.partition(" ")
+                if not service or not mounts_json:
+                    continue
+                mounts: list[dict[str, str]] = json.loads(mounts_json)  # pyright: ignore[reportAny]
+                volumes = result.setdefault(service, {})
+                for m in mounts:
+                    name = m.get("Name")
+                    if m.get("Type") == "volume" and name:
+                        volumes[m.get("Destination", "")] = name
         except (subprocess.CalledProcessError, OSError, json.JSONDecodeError) as e:
             if is_permission_error(e):
                 raise
-            return None
-        return None
+            return {}
+        return result
 
 
 def _docker_socket_error() -> DockerAccessErrorCode | None:
@@ -1,11 +1,10 @@
 """nekro-agent.yaml 应用配置管理。"""
 
+import copy
+import functools
 from pathlib import Path
 from typing import cast
 
-import yaml
-
-
 from ..utils.console import success, warning
 
 
@@ -21,12 +20,26 @@ def load_na_config(data_dir: Path) -> dict[str, object]:
         配置字典。文件不存在时返回空字典。
     """
     path = config_path(data_dir)
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
         warning(f"配置文件不存在: {path}")
         return {}
 
-    with open(path, encoding="utf-8") as f:
-        data: object = cast(object, yaml.safe_load(f))
+    # 缓存的是共享对象，返回副本避免调用方修改污染缓存
+    return copy.deepcopy(_parse_na_config(path, stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_na_config(path: Path, mtime_ns: int, size: int) -> dict[str, object]:
+    """解析配置文件；以 (路径, mtime, 大小) 为键缓存，文件变化后自动失效。"""
+    # yaml 只在读写配置时才导入；PyPI 上的 PyYAML wheel 自带 libyaml，
+    # C 实现的解析/序列化比纯 Python 版快一个数量级
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    # 直接交给 libyaml 原始字节，省去文本模式读取与解码
+    data: object = cast(object, yaml.load(path.read_bytes(), Loader=loader))
 
     return cast(dict[str, object], data) if isinstance(data, dict) else {}
 
@@ -36,20 +49,35 @@ def save_na_config(data_dir: Path, data: dict[str, object]) -> None:
     path = config_path(data_dir)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(path, "w", encoding="utf-8") as f:
-        yaml.dump(  # type: ignore
-            data, f, default_flow_style=False, allow_unicode=True, sort_keys=False
-        )
+    import yaml
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    content: bytes = yaml.dump(  # type: ignore
+        data,
+        Dumper=dumper,
+        default_flow_style=False,
+        allow_unicode=True,
+        sort_keys=False,
+        encoding="utf-8",
+    )
+    _ = path.write_bytes(content)
+    _parse_na_config.cache_clear()
 
     success(f"配置已保存: {path}")
 
 
+@functools.lru_cache(maxsize=256)
+def _split_path(key_path: str) -> tuple[str, ...]:
+    """拆分点分路径；同一路径反复访问时复用拆分结果。"""
+    return tuple(key_path.split("."))
+
+
 def get_nested(data: dict[str, object], key_path: str) -> object | None:
     """通过点分路径获取嵌套值。
 
     示例: get_nested(data, "MODEL_GROUPS.default.API_KEY")
     """
-    keys = key_path.split(".")
+    keys = _split_path(key_path)
     current: object = data
     for key in keys:
         if isinstance(current, dict) and key in current:
@@ -63,21 +91,10 @@ def get_nested(data: dict[str, object], key_path: str) -> object | None:
 
 def set_nested(data: dict[str, object], key_path: str, value: object) -> None:
     """通过点分路径设置嵌套值。"""
-    keys = key_path.split(".")
+    keys = _split_path(key_path)
     current: dict[str, object] = data
     for key in keys[:-1]:
-        if key not in current or not isinstance(current[key], dict):
-            current[key] = {}
-
-        # We ensured it's a dict above, so we can cast it
-        next_val = current[key]
-        if isinstance(next_val, dict):
-            current = cast(dict[str, object], next_val)
-        else:
-            # Fallback (should normally not happen due to line 70)
-            new_dict: dict[str, object] = {}
-            current[key] = new_dict
-            current = new_dict
+        current = _ensure_dict(current, key)
 
     current[keys[-1]] = value
 
@@ -92,45 +109,17 @@ def set_model_group(
     **kwargs: object,
 ) -> None:
     """设置模型组。"""
-    groups: dict[str, object]
-
-    if "system" in data and isinstance(data["system"], dict):
-        system = cast(dict[str, object], data["system"])
-        # setdefault returns the value. We need to cast it.
-        groups_val = system.setdefault("MODEL_GROUPS", {})
-        if isinstance(groups_val, dict):
-            groups = cast(dict[str, object], groups_val)
-        else:
-            groups = {}  # Should probably fix it in data if it's wrong type?
-            system["MODEL_GROUPS"] = groups
-    else:
-        groups_val = data.setdefault("MODEL_GROUPS", {})
-        if isinstance(groups_val, dict):
-            groups = cast(dict[str, object], groups_val)
-        else:
-            groups = {}
-            data["MODEL_GROUPS"] = groups
-
-    group_val = groups.get(group_name, {})
-    group: dict[str, object] = (
-        cast(dict[str, object], group_val) if isinstance(group_val, dict) else {}
-    )
-
+    groups = _ensure_dict(_system_section(data), "MODEL_GROUPS")
+    group = _ensure_dict(groups, group_name)
     group["BASE_URL"] = base_url
     group["API_KEY"] = api_key
     group["CHAT_MODEL"] = model
-    group.update(kwargs)  # kwargs is dict[str, object] which fits
-    groups[group_name] = group
+    group.update(kwargs)
 
 
 def get_super_users(data: dict[str, object]) -> list[str]:
     """获取管理员列表。"""
-    system: object = data.get("system", data)
-    if not isinstance(system, dict):
-        system = {}
-
-    system_dict = cast(dict[str, object], system)
-    users = system_dict.get("SUPER_USERS", [])
+    users = _system_section(data).get("SUPER_USERS", [])
     if isinstance(users, list):
         # Assuming list of strings. If not, we might need check.
         return cast(list[str], users)
@@ -139,8 +128,22 @@ def get_super_users(data: dict[str, object]) -> list[str]:
 
 def set_super_users(data: dict[str, object], users: list[str]) -> None:
     """设置管理员列表。"""
-    if "system" in data and isinstance(data["system"], dict):
-        system = cast(dict[str, object], data["system"])
-        system["SUPER_USERS"] = users
-    else:
-        data["SUPER_USERS"] = users
+    _system_section(data)["SUPER_USERS"] = users
+
+
+def _ensure_dict(parent: dict[str, object], key: str) -> dict[str, object]:
+    """返回 ``parent[key]``；不存在或不是字典时替换为新的空字典。"""
+    value = parent.get(key)
+    if isinstance(value, dict):
+        return cast(dict[str, object], value)
+    new: dict[str, object] = {}
+    parent[key] = new
+    return new
+
+
+def _system_section(data: dict[str, object]) -> dict[str, object]:
+    """返回存放系统配置的字典：存在 ``system`` 段时为该段，否则为根字典。"""
+    system = data.get("system")
+    if isinstance(system, dict):
+        return cast(dict[str, object], system)
+    return data
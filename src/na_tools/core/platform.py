@@ -1,18 +1,27 @@
 """跨平台适配层（仅支持 Linux 和 macOS）。"""
 
+import copy
+import functools
+import json
 import os
 import platform
 import subprocess
 import sys
+import time
 from pathlib import Path
 from typing import cast
 
 
 from ..utils.console import error, info
+from .config import load_env
 
 
+@functools.lru_cache(maxsize=1)
 def get_os() -> str:
-    """返回当前操作系统标识: 'linux', 'darwin'。Windows 下直接退出。"""
+    """返回当前操作系统标识: 'linux', 'darwin'。Windows 下直接退出。
+
+    结果在进程内缓存，``is_linux``/``is_macos`` 的反复调用只探测一次。
+    """
     os_name = platform.system().lower()
     if os_name == "windows":
         error("当前工具不支持 Windows 系统。")
@@ -39,12 +48,19 @@ def get_global_config_dir() -> Path:
 def load_global_config() -> dict[str, object]:
     """加载全局配置。"""
     config_path = get_global_config_dir() / "config.json"
-    if not config_path.exists():
-        return {}
     try:
-        import json
+        stat = config_path.stat()
+    except OSError:
+        return {}
+    # 缓存的是共享对象，返回副本避免调用方修改污染缓存
+    return copy.deepcopy(_parse_global_config(config_path, stat.st_mtime_ns, stat.st_size))
+
 
-        data = json.loads(config_path.read_text(encoding="utf-8"))  # pyright: ignore[reportAny]
+@functools.lru_cache(maxsize=4)
+def _parse_global_config(path: Path, mtime_ns: int, size: int) -> dict[str, object]:
+    """解析全局配置；以 (路径, mtime, 大小) 为键缓存，文件变化后自动失效。"""
+    try:
+        data = json.loads(path.read_bytes())  # pyright: ignore[reportAny]
         if isinstance(data, dict):
             return cast(dict[str, object], data)
         return {}
@@ -54,12 +70,11 @@ def load_global_config() -> dict[str, object]:
 
 def save_global_config(config: dict[str, object]) -> None:
     """保存全局配置。"""
-    import json
-
     config_path = get_global_config_dir() / "config.json"
-    _ = config_path.write_text(
-        json.dumps(config, indent=2, ensure_ascii=False), encoding="utf-8"
+    _ = config_path.write_bytes(
+        json.dumps(config, indent=2, ensure_ascii=False).encode("utf-8")
     )
+    _parse_global_config.cache_clear()
 
 
 def set_default_data_dir(data_dir: Path) -> None:
@@ -69,8 +84,6 @@ def set_default_data_dir(data_dir: Path) -> None:
     config["current_data_dir"] = str_path
 
     # Update installations list
-    import time
-
     installations = config.get("installations", {})
     if not isinstance(installations, dict):
         installations = {}
@@ -116,8 +129,6 @@ def set_global_mirror(mirror: str) -> None:
 def resolve_mirror(env_path: Path | None = None) -> str:
     """统一解析镜像源。优先级：实例 .env MIRROR_REGISTRY > 全局 mirror_registry。"""
     if env_path and env_path.exists():
-        from .config import load_env
-
         env = load_env(env_path)
         instance_mirror = env.get("MIRROR_REGISTRY", "")
         if instance_mirror:
@@ -133,6 +144,7 @@ def run_cmd(
     check: bool = True,
     env: dict[str, str] | None = None,
     unset_keys: set[str] | None = None,
+    input: str | None = None,
 ) -> subprocess.CompletedProcess[str]:
     """跨平台命令执行封装。
 
@@ -143,8 +155,12 @@ def run_cmd(
         check: 是否在非零退出码时抛异常。
         env: 额外环境变量（合并到当前环境）。
         unset_keys: 需要从环境中移除的变量名集合。
+        input: 写入子进程标准输入的文本。
     """
     merged_env: dict[str, str] | None = None
+    # 待移除的变量都不在当前环境中时，直接继承父进程环境，省去整份拷贝
+    if unset_keys and not env and unset_keys.isdisjoint(os.environ):
+        unset_keys = None
     if env or unset_keys:
         merged_env = {**os.environ}
         if unset_keys:
@@ -160,5 +176,6 @@ def run_cmd(
         text=True,
         check=check,
         env=merged_env,
+        input=input,
     )
 
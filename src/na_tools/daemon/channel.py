@@ -6,8 +6,6 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, cast
 
-import yaml
-
 from ..core.compose import COMPOSE_FILE, SERVICE_AGENT
 from ..core.config import load_env, save_env
 from ..core.docker import DockerEnv
@@ -103,6 +101,8 @@ def patch_compose_daemon_channel(data_dir: Path) -> tuple[bool, str | None]:
     if not compose_path.exists():
         return False, f"compose file not found: {compose_path}"
 
+    import yaml
+
     try:
         with open(compose_path, encoding="utf-8") as f:
             content = yaml.safe_load(f)
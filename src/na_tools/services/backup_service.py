@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import heapq
+import os
 import shutil
-import tarfile
+import tempfile
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -14,6 +16,7 @@ from typing import Protocol
 from ..core.compose import compose_exists, resolve_service_volumes
 from ..core.docker import DockerEnv
 from ..core.platform import default_data_dir, get_global_config_dir, resolve_mirror
+from ..utils.archive import open_tar_gz_writer
 from .common import EventSink, ServiceError, ServiceEvent, null_event_sink
 
 _CACHE_PATTERNS: list[str] = [
@@ -47,14 +50,13 @@ class DockerLike(Protocol):
     ) -> dict[str, object] | None:
         """Return compose config."""
 
-    def get_service_volume(
+    def get_service_volumes(
         self,
         cwd: Path,
-        service: str,
-        target: str,
+        services: list[str],
         env_file: Path | None = None,
-    ) -> str | None:
-        """Return a named volume mounted by a service."""
+    ) -> dict[str, dict[str, str]]:
+        """Return named volumes mounted by services, keyed by mount target."""
 
 
 DockerFactory = Callable[[], DockerLike]
@@ -70,6 +72,7 @@ class BackupRequest:
     output: Path | None = None
     no_restart: bool = False
     name: str | None = None
+    compress_level: int = 6
 
 
 @dataclass(frozen=True)
@@ -121,15 +124,13 @@ class BackupService:
         backup_path = self._backup_path(data_dir, request)
         backup_path.parent.mkdir(parents=True, exist_ok=True)
 
-        volume_backups_map: list[tuple[str, str, Path]] = []
-        volumes_dir = data_dir / "volumes_backup_tmp"
+        volume_targets: list[tuple[str, str]] = []
         env_file = env_path if env_path.exists() else None
-        if compose_exists(data_dir) and docker.compose_installed:
-            for vol_name, filename in resolve_service_volumes(docker, data_dir, env_file):
-                volume_backups_map.append((vol_name, filename, volumes_dir / filename))
-
         should_restart = False
         if compose_exists(data_dir) and docker.compose_installed:
+            # compose config 只解析一次，须在停止服务前读取卷信息
+            volume_targets = resolve_service_volumes(docker, data_dir, env_file)
+
             sink(ServiceEvent("info", "正在停止服务以确保数据一致性..."))
             if not docker.down(cwd=data_dir, env_file=env_file):
                 raise BackupServiceError(
@@ -139,36 +140,55 @@ class BackupService:
             should_restart = True
 
         volume_backups: list[Path] = []
+        # 临时卷备份放在数据目录旁：不进入数据目录，归档时无需再排除；
+        # 也不用系统临时目录，避免 tmpfs 空间不足或 snap 版 docker 无法挂载 /tmp
+        volumes_dir = Path(tempfile.mkdtemp(prefix=".na-tools-vol-", dir=data_dir.parent))
         try:
-            if volume_backups_map:
+            if volume_targets:
                 mirror = resolve_mirror(env_file)
                 alpine_images = (
                     [f"{mirror}/alpine:latest", "alpine:latest"]
                     if mirror
                     else ["alpine:latest"]
                 )
-                volumes_dir.mkdir(exist_ok=True)
+                volume_backups_map = [
+                    (vol_name, filename, volumes_dir / filename)
+                    for vol_name, filename in volume_targets
+                ]
+                names = ", ".join(vol_name for vol_name, _ in volume_targets)
+                sink(ServiceEvent("info", f"正在备份存储卷 {names}..."))
+                # 所有卷挂载进同一个 sidecar 容器，容器内并行打包
+                volumes = {
+                    vol_name: f"/data_{i}"
+                    for i, (vol_name, _, _) in enumerate(volume_backups_map)
+                }
+                volumes[str(volumes_dir)] = "/backup"
+                cmd = _volume_backup_cmd(
+                    [filename for _, filename, _ in volume_backups_map],
+                    request.compress_level,
+                )
+                for image in alpine_images:
+                    if docker.run_ephemeral(image=image, cmd=cmd, volumes=volumes):
+                        break
+                    # 已有卷打包成功说明镜像可用，失败与镜像无关，不再回退
+                    if any(backup_file.exists() for _, _, backup_file in volume_backups_map):
+                        break
+                    if image != alpine_images[-1]:
+                        sink(ServiceEvent("warning", f"镜像 {image} 拉取失败，尝试回退..."))
                 for vol_name, filename, backup_file in volume_backups_map:
-                    sink(ServiceEvent("info", f"正在备份存储卷 {vol_name}..."))
-                    success_backup = False
-                    for image in alpine_images:
-                        success_backup = docker.run_ephemeral(
-                            image=image,
-                            cmd=["tar", "czf", f"/backup/{filename}", "-C", "/data", "."],
-                            volumes={vol_name: "/data", str(volumes_dir): "/backup"},
-                        )
-                        if success_backup:
-                            break
-                        if image != alpine_images[-1]:
-                            sink(ServiceEvent("warning", f"镜像 {image} 拉取失败，尝试回退..."))
-                    if success_backup:
+                    if backup_file.exists():
                         volume_backups.append(backup_file)
                         sink(ServiceEvent("success", f"卷备份完成: {filename}"))
                     else:
                         sink(ServiceEvent("error", f"卷备份失败: {vol_name}"))
 
             sink(ServiceEvent("info", f"正在备份数据到: {backup_path}"))
-            skipped_cache = self._write_archive(data_dir, backup_path, volume_backups)
+            skipped_cache = self._write_archive(
+                data_dir,
+                backup_path,
+                volume_backups,
+                request.compress_level,
+            )
         except Exception as exc:
             if should_restart and not request.no_restart:
                 sink(ServiceEvent("info", "正在重新启动服务..."))
@@ -177,8 +197,11 @@ class BackupService:
                 raise
             raise BackupServiceError("backup_failed", f"备份失败: {exc}") from exc
         finally:
-            if volumes_dir.exists():
+            try:
                 shutil.rmtree(volumes_dir)
+            except OSError as exc:
+                # 容器内写出的文件可能属 root，删除失败时提示用户手动清理
+                sink(ServiceEvent("warning", f"临时卷备份目录清理失败，请手动删除 {volumes_dir}: {exc}"))
 
         service_restarted = False
         if should_restart and not request.no_restart:
@@ -210,16 +233,19 @@ class BackupService:
         backup_dir = backup_dir_for(resolved_data_dir, self.config_dir_getter)
         if not backup_dir.exists():
             return []
-        backups = sorted(
-            backup_dir.glob("*.tar.gz"),
-            key=lambda path: path.stat().st_mtime,
-            reverse=True,
-        )
-        if name:
-            backups = [path for path in backups if parse_backup_name(path.name) == name]
+        # scandir 借助目录项类型过滤，DirEntry.stat() 每个文件只发起一次 stat
+        with os.scandir(backup_dir) as it:
+            summaries = [
+                _backup_summary(Path(entry.path), entry.stat())
+                for entry in it
+                if entry.name.endswith(".tar.gz")
+                and not entry.name.startswith(".")
+                and entry.is_file()
+                and (not name or parse_backup_name(entry.name) == name)
+            ]
         if limit is not None:
-            backups = backups[:limit]
-        return [backup_summary(path) for path in backups]
+            return heapq.nlargest(limit, summaries, key=_summary_created_at)
+        return sorted(summaries, key=_summary_created_at, reverse=True)
 
     def _backup_path(self, data_dir: Path, request: BackupRequest) -> Path:
         if request.output is not None:
@@ -235,25 +261,67 @@ class BackupService:
         data_dir: Path,
         backup_path: Path,
         volume_backups: list[Path],
+        compress_level: int = 6,
     ) -> int:
         skipped_cache = 0
-
-        def _tar_filter(ti: tarfile.TarInfo) -> tarfile.TarInfo | None:
-            nonlocal skipped_cache
-            if "volumes_backup_tmp" in ti.name:
-                return None
-            if is_cache_path(ti.name):
-                skipped_cache += 1
-                return None
-            return ti
-
-        with tarfile.open(backup_path, "w:gz") as tar:
-            tar.add(data_dir, arcname=data_dir.name, filter=_tar_filter)
+        root_name = data_dir.name
+
+        with open_tar_gz_writer(backup_path, compress_level) as tar:
+            tar.add(data_dir, arcname=root_name, recursive=False)
+            # 在目录层面剪枝：被排除的目录整棵子树都不会被遍历
+            for root, dirs, files in os.walk(data_dir, onerror=_raise_walk_error):
+                rel_root = os.path.relpath(root, data_dir)
+                arc_root = root_name if rel_root == "." else f"{root_name}/{rel_root}"
+                kept_dirs: list[str] = []
+                for name in sorted(dirs):
+                    arcname = f"{arc_root}/{name}"
+                    if is_cache_path(arcname):
+                        skipped_cache += 1
+                        continue
+                    path = os.path.join(root, name)
+                    tar.add(path, arcname=arcname, recursive=False)
+                    if not os.path.islink(path):
+                        kept_dirs.append(name)
+                dirs[:] = kept_dirs
+                for name in sorted(files):
+                    arcname = f"{arc_root}/{name}"
+                    if is_cache_path(arcname):
+                        skipped_cache += 1
+                        continue
+                    tar.add(os.path.join(root, name), arcname=arcname, recursive=False)
             for volume_backup in volume_backups:
                 tar.add(volume_backup, arcname=f"volumes/{volume_backup.name}")
         return skipped_cache
 
 
+def _raise_walk_error(exc: OSError) -> None:
+    # os.walk 默认静默忽略错误；备份必须完整，权限等错误需向上抛出
+    raise exc
+
+
+_VOLUME_BACKUP_SCRIPT = """\
+set -o pipefail
+level="$1"; shift
+n=0; pids=""
+for f in "$@"; do
+  (tar cf - -C "/data_$n" . | gzip -"$level" > "/backup/$f" || { rm -f "/backup/$f"; exit 1; }) &
+  pids="$pids $!"; n=$((n + 1))
+done
+status=0
+for p in $pids; do wait "$p" || status=1; done
+exit "$status"
+"""
+
+
+def _volume_backup_cmd(filenames: list[str], compress_level: int) -> list[str]:
+    """Build the sidecar command that archives ``/data_<i>`` into ``/backup/<filenames[i]>``.
+
+    Volumes are packed concurrently; a failed volume leaves no output file.
+    """
+
+    return ["sh", "-c", _VOLUME_BACKUP_SCRIPT, "sh", str(compress_level), *filenames]
+
+
 def is_cache_path(arcname: str) -> bool:
     """Return whether an archive member should be skipped as cache."""
 
@@ -304,10 +372,17 @@ def backup_dir_for(
 def backup_summary(path: Path) -> BackupSummary:
     """Return a structured backup summary."""
 
-    stat = path.stat()
+    return _backup_summary(path, path.stat())
+
+
+def _backup_summary(path: Path, stat: os.stat_result) -> BackupSummary:
     return BackupSummary(
         path=path,
         name=parse_backup_name(path.name),
         created_at=datetime.fromtimestamp(stat.st_mtime),
         size_bytes=stat.st_size,
     )
+
+
+def _summary_created_at(summary: BackupSummary) -> datetime:
+    return summary.created_at
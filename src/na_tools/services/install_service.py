@@ -2,18 +2,19 @@
 
 from __future__ import annotations
 
+import os
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Protocol
 
 from ..core.compose import (
-    apply_mirror_to_compose,
+    COMPOSE_FILE,
     download_compose,
     patch_compose_isolation,
-    set_image_tag,
+    update_compose_images,
 )
-from ..core.config import load_env, setup_env
+from ..core.config import ENV_EXAMPLE_FILENAME, load_env, setup_env
 from ..core.docker import DockerEnv
 from ..core.platform import default_data_dir, resolve_mirror, set_default_data_dir
 from ..daemon.channel import DaemonChannelResult, ensure_daemon_channel
@@ -103,33 +104,50 @@ class InstallService:
         data_dir.mkdir(parents=True, exist_ok=True)
         sink(ServiceEvent("info", f"数据目录: {data_dir}"))
 
-        sink(ServiceEvent("info", "正在配置 .env 文件..."))
-        try:
-            env_path = setup_env(
-                data_dir,
-                interactive=request.interactive_env,
-                with_napcat=request.with_napcat,
-                port=request.port,
-            )
-        except RuntimeError as exc:
-            raise InstallServiceError("env_setup_failed", str(exc)) from exc
-        if request.continue_after_env is not None and not request.continue_after_env():
-            raise InstallServiceError("install_cancelled", "安装已取消。您可以编辑 .env 文件后重新运行安装。")
-
+        # compose 文件与 .env.example 模板并发下载，setup_env 发现模板已存在即跳过下载。
+        # compose 文件先保存到暂存路径，用户确认 .env 后才放入数据目录，
+        # 避免取消安装后残留的 compose 文件被误认为已有安装
         sink(ServiceEvent("info", "正在下载 docker-compose.yml..."))
-        if not download_compose(data_dir, with_napcat=request.with_napcat):
+        need_env_example = not any(
+            (data_dir / name).exists() for name in (".env", ENV_EXAMPLE_FILENAME)
+        )
+        staged_compose = data_dir / f".{COMPOSE_FILE}.download"
+        if not download_compose(
+            data_dir,
+            with_napcat=request.with_napcat,
+            with_env_example=need_env_example,
+            output=staged_compose,
+        ):
             raise InstallServiceError("compose_download_failed", "无法下载 docker-compose.yml，请检查网络连接。")
 
+        try:
+            sink(ServiceEvent("info", "正在配置 .env 文件..."))
+            try:
+                env_path = setup_env(
+                    data_dir,
+                    interactive=request.interactive_env,
+                    with_napcat=request.with_napcat,
+                    port=request.port,
+                )
+            except RuntimeError as exc:
+                raise InstallServiceError("env_setup_failed", str(exc)) from exc
+            if request.continue_after_env is not None and not request.continue_after_env():
+                raise InstallServiceError("install_cancelled", "安装已取消。您可以编辑 .env 文件后重新运行安装。")
+        except BaseException:
+            staged_compose.unlink(missing_ok=True)
+            raise
+        os.replace(staged_compose, data_dir / COMPOSE_FILE)
+
         patch_compose_isolation(data_dir)
         mirror = resolve_mirror(env_path)
         if mirror:
             sink(ServiceEvent("info", f"应用镜像站配置: {mirror}"))
-            apply_mirror_to_compose(data_dir, mirror)
-
         if request.preview:
             sink(ServiceEvent("info", "使用 preview 频道镜像..."))
-            if not set_image_tag(data_dir, "kromiose/nekro-agent", "preview"):
-                sink(ServiceEvent("warning", "无法修改镜像 tag，将使用默认 latest 版本。"))
+        # 镜像站前缀与 preview tag 合并为一次 compose 读写
+        image_tag = ("kromiose/nekro-agent", "preview") if request.preview else None
+        if not update_compose_images(data_dir, mirror=mirror, image_tag=image_tag):
+            sink(ServiceEvent("warning", "无法修改镜像 tag，将使用默认 latest 版本。"))
 
         daemon_channel = ensure_daemon_channel(data_dir, overwrite_env=True)
         sink(ServiceEvent("info", f"daemon 实例 ID: {daemon_channel.instance_id}"))
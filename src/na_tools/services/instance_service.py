@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
@@ -117,8 +118,6 @@ class InstanceService:
         daemon_channel = ensure_daemon_channel(data_dir, overwrite_env=False)
         already_bound = str_path in installations
         if not already_bound:
-            import time
-
             install_info: dict[str, int | str] = {
                 "installed_at": int(time.time()),
                 "last_used": int(time.time()),
@@ -189,7 +188,8 @@ class InstanceService:
         return path
 
     def status(self, data_dir: Path | None = None) -> StatusResult:
-        resolved = Path(data_dir or default_data_dir()).expanduser().resolve()
+        # 只读查询无需规范路径，absolute() 不逐级解析符号链接
+        resolved = Path(data_dir or default_data_dir()).expanduser().absolute()
         if not compose_exists(resolved):
             raise InstanceServiceError("compose_missing", f"未找到已有安装。数据目录: {resolved}")
         docker = self.docker_factory()
@@ -207,7 +207,8 @@ class InstanceService:
         follow: bool = False,
         tail: int = 100,
     ) -> None:
-        resolved = Path(data_dir or default_data_dir()).expanduser().resolve()
+        # 只读查询无需规范路径，absolute() 不逐级解析符号链接
+        resolved = Path(data_dir or default_data_dir()).expanduser().absolute()
         if not compose_exists(resolved):
             raise InstanceServiceError("compose_missing", f"未找到已有安装。数据目录: {resolved}")
         docker = self.docker_factory()
@@ -2,21 +2,29 @@
 
 from __future__ import annotations
 
+import gzip
+import itertools
+import os
 import shutil
 import sys
 import tarfile
 import tempfile
-from collections.abc import Callable
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Protocol
+from typing import IO, Protocol
 
 from ..core.compose import COMPOSE_FILE, resolve_service_volumes
 from ..core.docker import DockerEnv
 from ..core.platform import default_data_dir, resolve_mirror
+from ..utils.archive import open_tar_gz_reader
 from .common import EventSink, ServiceError, ServiceEvent, null_event_sink
 
+_GZIP_MAGIC = b"\x1f\x8b"
+# 删除被替换旧文件的线程数，删除操作主要受文件系统调用延迟限制
+_REMOVAL_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 
 class DockerLike(Protocol):
     compose_installed: bool
@@ -46,19 +54,27 @@ class DockerLike(Protocol):
     ) -> bool:
         """Run a short-lived container."""
 
+    def run_ephemeral_stdin(
+        self,
+        image: str,
+        cmd: list[str],
+        stdin: IO[bytes],
+        volumes: dict[str, str],
+    ) -> bool:
+        """Run a short-lived container fed from ``stdin``."""
+
     def get_compose_config(
         self, cwd: Path, env_file: Path | None = None
     ) -> dict[str, object] | None:
         """Return compose config."""
 
-    def get_service_volume(
+    def get_service_volumes(
         self,
         cwd: Path,
-        service: str,
-        target: str,
+        services: list[str],
         env_file: Path | None = None,
-    ) -> str | None:
-        """Return a named volume mounted by a service."""
+    ) -> dict[str, dict[str, str]]:
+        """Return named volumes mounted by services, keyed by mount target."""
 
 
 DockerFactory = Callable[[], DockerLike]
@@ -103,7 +119,7 @@ class RestoreService:
         data_dir = Path(request.data_dir or default_data_dir()).expanduser().resolve()
         backup_path = request.backup_file.expanduser().resolve()
 
-        if not tarfile.is_tarfile(backup_path):
+        if not _has_gzip_magic(backup_path):
             raise RestoreServiceError("invalid_backup", f"不是有效的备份文件: {backup_path}")
 
         docker = self.docker_factory()
@@ -117,45 +133,43 @@ class RestoreService:
 
         restored_volumes: list[str] = []
         sink(ServiceEvent("info", f"正在恢复备份到: {data_dir}"))
+        mirror = resolve_mirror(env_file)
+        alpine_image = f"{mirror}/alpine:latest" if mirror else "alpine:latest"
+        removals = _PendingRemovals(data_dir)
         try:
-            with tarfile.open(backup_path, "r:gz") as tar:
-                members = tar.getmembers()
-                if not members:
-                    raise RestoreServiceError("empty_backup", "备份文件为空。")
-                top_dir = members[0].name.split("/")[0]
-                with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                with open_tar_gz_reader(backup_path) as tar:
+                    members = iter(tar)
+                    first = next(members, None)
+                    if first is None:
+                        raise RestoreServiceError("empty_backup", "备份文件为空。")
+                    top_dir = first.name.split("/")[0]
+                    data_members = self._data_members(
+                        tar,
+                        itertools.chain((first,), members),
+                        top_dir,
+                        data_dir,
+                        env_file,
+                        docker,
+                        alpine_image,
+                        restored_volumes,
+                        removals,
+                        sink,
+                    )
                     if sys.version_info >= (3, 12):
-                        tar.extractall(tmp_dir, filter="data")
+                        tar.extractall(data_dir, members=data_members, filter="data")
                     else:
-                        tar.extractall(tmp_dir)
-                    tmp_path = Path(tmp_dir)
-                    extracted_dir = tmp_path / top_dir
-                    volumes_backup_dir = tmp_path / "volumes"
-                    has_volumes = volumes_backup_dir.exists() and volumes_backup_dir.is_dir()
-
-                    if extracted_dir.exists():
-                        data_dir.mkdir(parents=True, exist_ok=True)
-                        mirror = resolve_mirror(env_file)
-                        alpine_image = f"{mirror}/alpine:latest" if mirror else "alpine:latest"
-                        for item in extracted_dir.iterdir():
-                            if item.name == "volumes":
-                                continue
-                            dest = data_dir / item.name
-                            if dest.exists():
-                                remove_existing_path(dest, data_dir, docker, alpine_image, sink)
-                            _ = shutil.move(str(item), str(dest))
-
-                    if has_volumes:
-                        restored_volumes.extend(
-                            self._restore_volumes(
-                                data_dir,
-                                env_file,
-                                volumes_backup_dir,
-                                docker,
-                                sink,
-                            )
-                        )
+                        tar.extractall(data_dir, members=data_members)
+            except BaseException:
+                # 归档损坏或成员被拒绝时清理已解包的内容并放回旧文件，保持数据目录原样
+                removals.rollback()
+                raise
+            removals.finish(docker, alpine_image, sink)
             sink(ServiceEvent("success", "备份恢复完成!"))
+        except (tarfile.TarError, gzip.BadGzipFile, EOFError) as exc:
+            raise RestoreServiceError(
+                "invalid_backup", f"不是有效的备份文件: {backup_path} ({exc})"
+            ) from exc
         except Exception as exc:
             if isinstance(exc, (RestoreServiceError, PermissionError)):
                 raise
@@ -169,7 +183,10 @@ class RestoreService:
             start_service = request.choose_start_service()
         if bool(start_service) and (data_dir / COMPOSE_FILE).exists() and docker.compose_installed:
             sink(ServiceEvent("info", "正在启动服务..."))
-            if docker.up(cwd=data_dir, env_file=env_path if env_path.exists() else None):
+            # 恢复只会替换而不会删除已有的 .env，仅在恢复前不存在时需要重新检查
+            if env_file is None and env_path.exists():
+                env_file = env_path
+            if docker.up(cwd=data_dir, env_file=env_file):
                 service_started = True
                 sink(ServiceEvent("success", "服务已启动。"))
             else:
@@ -183,17 +200,75 @@ class RestoreService:
             restored_volumes=tuple(restored_volumes),
         )
 
-    def _restore_volumes(
+    def _data_members(
         self,
+        tar: tarfile.TarFile,
+        members: Iterable[tarfile.TarInfo],
+        top_dir: str,
         data_dir: Path,
         env_file: Path | None,
-        volumes_backup_dir: Path,
         docker: DockerLike,
+        alpine_image: str,
+        restored_volumes: list[str],
+        removals: _PendingRemovals,
         sink: EventSink,
-    ) -> list[str]:
+    ) -> Iterator[tarfile.TarInfo]:
+        """Yield data-dir members relative to ``data_dir`` while streaming the archive.
+
+        Existing top-level targets are moved aside right before their first member
+        is extracted and only deleted once the whole archive has been restored;
+        ``volumes/*`` members are piped straight into helper containers.
+        Backups store the data dir before ``volumes/``, so the restored compose
+        file is already in place when the first volume member arrives.
+        """
+        cleared: set[str] = set()
+        volume_map: dict[str, str] | None = None
+        prefix = f"{top_dir}/"
+        for member in members:
+            head, _, rel = member.name.partition("/")
+            if head == "volumes" and rel:
+                if volume_map is None:
+                    volume_map = self._prepare_volume_restore(data_dir, env_file, docker, sink)
+                member.name = rel
+                target_volume = volume_map.get(rel)
+                if target_volume and self._restore_volume(
+                    tar, member, target_volume, docker, alpine_image, sink
+                ):
+                    restored_volumes.append(target_volume)
+                continue
+            if head != top_dir or not rel:
+                continue
+
+            child = rel.split("/", 1)[0]
+            if child == "volumes":
+                continue
+            if child not in cleared:
+                cleared.add(child)
+                data_dir.mkdir(parents=True, exist_ok=True)
+                dest = data_dir / child
+                if not (dest.is_symlink() or dest.exists()):
+                    removals.created.append(dest)
+                elif not removals.discard(dest):
+                    remove_existing_path(dest, data_dir, docker, alpine_image, sink)
+                    removals.created.append(dest)
+
+            member.name = rel
+            if member.islnk() and member.linkname.startswith(prefix):
+                member.linkname = member.linkname[len(prefix) :]
+            yield member
+
+    def _prepare_volume_restore(
+        self,
+        data_dir: Path,
+        env_file: Path | None,
+        docker: DockerLike,
+        sink: EventSink,
+    ) -> dict[str, str]:
+        """Create the compose volumes and map backup file names to volume names."""
+
         sink(ServiceEvent("info", "发现存储卷备份，正在恢复..."))
         if not ((data_dir / COMPOSE_FILE).exists() and docker.compose_installed):
-            return []
+            return {}
 
         sink(ServiceEvent("info", "正在初始化服务容器..."))
         _ = docker.compose(
@@ -203,29 +278,113 @@ class RestoreService:
             env_file=env_file,
             check=False,
         )
-        volume_map = {
+        return {
             filename: vol_name
             for vol_name, filename in resolve_service_volumes(docker, data_dir, env_file)
         }
-        restored: list[str] = []
-        mirror = resolve_mirror(env_file)
-        alpine_image = f"{mirror}/alpine:latest" if mirror else "alpine:latest"
-        for volume_file in volumes_backup_dir.iterdir():
-            target_volume = volume_map.get(volume_file.name)
-            if not target_volume:
-                continue
-            sink(ServiceEvent("info", f"正在恢复存储卷 {target_volume} ({volume_file.name})..."))
-            success_restore = docker.run_ephemeral(
+
+    def _restore_volume(
+        self,
+        tar: tarfile.TarFile,
+        member: tarfile.TarInfo,
+        target_volume: str,
+        docker: DockerLike,
+        alpine_image: str,
+        sink: EventSink,
+    ) -> bool:
+        stream = tar.extractfile(member)
+        if stream is None:
+            return False
+
+        sink(ServiceEvent("info", f"正在恢复存储卷 {target_volume} ({member.name})..."))
+        with stream:
+            success_restore = docker.run_ephemeral_stdin(
                 image=alpine_image,
-                cmd=["tar", "xzf", f"/backup/{volume_file.name}", "-C", "/data"],
-                volumes={target_volume: "/data", str(volumes_backup_dir): "/backup"},
+                cmd=["tar", "xzf", "-", "-C", "/data"],
+                stdin=stream,
+                volumes={target_volume: "/data"},
             )
-            if success_restore:
-                restored.append(target_volume)
-                sink(ServiceEvent("success", f"卷恢复完成: {target_volume}"))
-            else:
-                sink(ServiceEvent("error", f"卷恢复失败: {target_volume}"))
-        return restored
+        if success_restore:
+            sink(ServiceEvent("success", f"卷恢复完成: {target_volume}"))
+        else:
+            sink(ServiceEvent("error", f"卷恢复失败: {target_volume}"))
+        return success_restore
+
+
+class _PendingRemovals:
+    """Move replaced top-level children aside until the restore succeeds.
+
+    Children are renamed into one hidden top-level directory. After a
+    successful extraction they are deleted on a thread pool; if extraction
+    fails, children created by the restore are removed and the old ones are
+    moved back so the data dir keeps its previous content.
+    """
+
+    def __init__(self, data_dir: Path) -> None:
+        self.data_dir = data_dir
+        self.trash: Path | None = None
+        self.moved: dict[Path, Path] = {}
+        # 本次恢复新建、且没有旧内容可放回的顶层子项
+        self.created: list[Path] = []
+
+    def discard(self, path: Path) -> bool:
+        """Move ``path`` aside; return False if it could not be moved."""
+
+        try:
+            if self.trash is None:
+                self.trash = Path(tempfile.mkdtemp(prefix=".na-restore-old-", dir=self.data_dir))
+            aside = self.trash / path.name
+            path.rename(aside)
+        except OSError:
+            return False
+        self.moved[path] = aside
+        return True
+
+    def finish(self, docker: DockerLike, alpine_image: str, sink: EventSink) -> None:
+        """Delete the moved-aside children and remove the holding directory."""
+
+        if self.trash is None:
+            return
+        with ThreadPoolExecutor(max_workers=_REMOVAL_WORKERS) as executor:
+            futures = {
+                executor.submit(_remove_path, aside): aside for aside in self.moved.values()
+            }
+        for future, aside in futures.items():
+            exc = future.exception()
+            if exc is not None:
+                # 多为容器写入的受限文件；下方同步删除整个暂存目录时会重试，必要时借助 Docker
+                sink(ServiceEvent("warning", f"旧文件删除失败，将随暂存目录一并清理: {aside} ({exc})"))
+        remove_existing_path(self.trash, self.data_dir, docker, alpine_image, sink)
+
+    def rollback(self) -> None:
+        """Remove partially restored children and put moved-aside ones back."""
+
+        for path in self.created:
+            try:
+                if path.is_symlink() or path.exists():
+                    _remove_path(path)
+            except OSError:
+                continue
+        for path, aside in self.moved.items():
+            try:
+                if path.is_symlink() or path.exists():
+                    _remove_path(path)
+                aside.rename(path)
+            except OSError:
+                continue
+        if self.trash is not None:
+            # 仍有未能放回的旧文件时保留该目录，避免丢失数据
+            try:
+                self.trash.rmdir()
+            except OSError:
+                pass
+
+
+def _remove_path(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
 
 
 def remove_existing_path(
@@ -238,10 +397,7 @@ def remove_existing_path(
     """Remove an existing restore target, using Docker for container-owned files."""
 
     try:
-        if path.is_dir() and not path.is_symlink():
-            shutil.rmtree(path)
-        else:
-            path.unlink()
+        _remove_path(path)
         return
     except PermissionError as exc:
         if remove_existing_path_with_docker(path, data_dir, docker, alpine_image, sink):
@@ -249,6 +405,16 @@ def remove_existing_path(
         raise exc
 
 
+def _has_gzip_magic(path: Path) -> bool:
+    """Cheap format check; corrupt archives are reported by the streaming reader."""
+
+    try:
+        with path.open("rb") as file:
+            return file.read(len(_GZIP_MAGIC)) == _GZIP_MAGIC
+    except OSError:
+        return False
+
+
 def remove_existing_path_with_docker(
     path: Path,
     data_dir: Path,
@@ -8,9 +8,6 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Literal, Protocol, cast
 
-import httpx
-import yaml
-
 from ..core.compose import COMPOSE_FILE, compose_exists, set_image_tag
 from ..core.config import load_env
 from ..core.docker import DockerAccessErrorCode, DockerEnv, docker_access_error_message
@@ -148,6 +145,7 @@ ConfigDirGetter = Callable[[], Path]
 
 def default_health_checker(data_dir: Path, env_path: Path) -> HealthCheckResult:
     """Verify app health through the exposed host port."""
+    import httpx
 
     env = load_env(env_path)
     port = env.get("NEKRO_EXPOSE_PORT", "8021") or "8021"
@@ -634,6 +632,8 @@ def read_agent_image(data_dir: Path) -> tuple[str | None, str | None]:
     if not compose_path.exists():
         return None, None
 
+    import yaml
+
     with open(compose_path, encoding="utf-8") as f:
         content = yaml.safe_load(f)
 
@@ -669,15 +669,12 @@ def find_latest_named_backup(
     backup_dir = config_dir_getter() / "backup" / data_dir.name
     if not backup_dir.exists():
         return None
-    backups = sorted(
-        backup_dir.glob("*.tar.gz"),
-        key=lambda path: path.stat().st_mtime,
-        reverse=True,
-    )
-    for backup_file in backups:
-        if _parse_backup_name(backup_file.name) == name:
-            return backup_file
-    return None
+    matches = [
+        backup_file
+        for backup_file in backup_dir.glob("*.tar.gz")
+        if _parse_backup_name(backup_file.name) == name
+    ]
+    return max(matches, key=lambda path: path.stat().st_mtime, default=None)
 
 
 def _parse_backup_name(filename: str) -> str | None:
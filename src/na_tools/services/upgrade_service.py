@@ -18,6 +18,7 @@ import httpx
 
 from .. import __version__
 from ..core.platform import run_cmd
+from ..utils.network import CHUNK_SIZE
 from .common import ServiceError
 
 GITHUB_LATEST_RELEASE_URL = (
@@ -397,7 +398,7 @@ class UpgradeService:
                 with client.stream("GET", url) as response:
                     response.raise_for_status()
                     with output.open("wb") as file:
-                        for chunk in response.iter_bytes():
+                        for chunk in response.iter_bytes(chunk_size=CHUNK_SIZE):
                             file.write(chunk)
         except httpx.HTTPError as exc:
             raise UpgradeServiceError(
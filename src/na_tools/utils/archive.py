@@ -0,0 +1,126 @@
+"""tar.gz 归档读写工具，优先使用多线程压缩程序或 ISA-L 加速。"""
+
+import gzip
+import shutil
+import subprocess
+import tarfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+
+try:
+    from isal import igzip
+except ImportError:
+    igzip = None
+
+# ISA-L 仅支持 0-3 级压缩
+_ISAL_MAX_LEVEL = 3
+
+# 文件、tar 流记录与成员数据拷贝的缓冲大小，减少大归档读写时的
+# 系统调用与内存分配次数
+_BUFSIZE = 1 << 20
+
+
+@contextmanager
+def open_tar_gz_writer(path: Path, compress_level: int = 6) -> Iterator[tarfile.TarFile]:
+    """打开用于写入的 tar.gz 归档。
+
+    依次尝试：1) pigz 多线程压缩；2) python-isal (igzip) SIMD 压缩；
+    3) 标准库单线程 gzip。输出均为标准 gzip 格式。
+    """
+    pigz = shutil.which("pigz")
+    if pigz is not None:
+        with _pigz_writer(pigz, path, compress_level) as tar:
+            yield tar
+        return
+
+    with open(path, "wb", buffering=_BUFSIZE) as out:
+        if igzip is not None:
+            gz = igzip.IGzipFile(
+                fileobj=out,
+                mode="wb",
+                compresslevel=min(compress_level, _ISAL_MAX_LEVEL),
+            )
+        else:
+            gz = gzip.GzipFile(fileobj=out, mode="wb", compresslevel=compress_level)
+        with gz, _open_stream(gz, "w|") as tar:
+            yield tar
+
+
+@contextmanager
+def open_tar_gz_reader(path: Path) -> Iterator[tarfile.TarFile]:
+    """以流式模式打开用于读取的 tar.gz 归档。
+
+    依次尝试：1) python-isal (igzip) SIMD 解压；2) pigz 子进程解压，
+    与本进程的解包写盘并行；3) 标准库单线程 gzip。
+
+    流式模式只能顺序访问成员，不支持 ``getmembers()`` 后再回头解压。
+    """
+    if igzip is None:
+        pigz = shutil.which("pigz")
+        if pigz is not None:
+            with _pigz_reader(pigz, path) as tar:
+                yield tar
+            return
+
+    with open(path, "rb", buffering=_BUFSIZE) as raw:
+        if igzip is None:
+            with _open_stream(raw, "r|gz") as tar:
+                yield tar
+            return
+
+        with igzip.IGzipFile(fileobj=raw, mode="rb") as gz:
+            with _open_stream(gz, "r|") as tar:
+                yield tar
+
+
+@contextmanager
+def _pigz_writer(pigz: str, path: Path, compress_level: int) -> Iterator[tarfile.TarFile]:
+    with open(path, "wb") as out:
+        proc = subprocess.Popen(
+            [pigz, f"-{compress_level}", "-c"],
+            stdin=subprocess.PIPE,
+            stdout=out,
+        )
+        assert proc.stdin is not None
+        try:
+            with _open_stream(proc.stdin, "w|") as tar:
+                yield tar
+        finally:
+            proc.stdin.close()
+            returncode = proc.wait()
+        if returncode != 0:
+            raise OSError(f"pigz 压缩失败，退出码: {returncode}")
+
+
+@contextmanager
+def _pigz_reader(pigz: str, path: Path) -> Iterator[tarfile.TarFile]:
+    proc = subprocess.Popen([pigz, "-dc", str(path)], stdout=subprocess.PIPE)
+    assert proc.stdout is not None
+    try:
+        with _open_stream(proc.stdout, "r|") as tar:
+            yield tar
+        # 读完剩余数据，让 pigz 完成 CRC 校验后再检查退出码
+        while proc.stdout.read(_BUFSIZE):
+            pass
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise tarfile.ReadError(f"pigz 解压失败，退出码: {returncode}")
+
+
+def _open_stream(fileobj: IO[bytes], mode: str) -> tarfile.TarFile:
+    # 写入使用 GNU 格式：长路径用 GNU longname 记录，不生成 PAX 扩展头，
+    # 恢复时无需逐成员解析扩展记录；读取时 format 参数不起作用
+    return tarfile.open(
+        fileobj=fileobj,
+        mode=mode,
+        bufsize=_BUFSIZE,
+        copybufsize=_BUFSIZE,
+        format=tarfile.GNU_FORMAT,
+    )
@@ -3,8 +3,19 @@
 import secrets
 import string
 
+_ALPHABET = (string.ascii_letters + string.digits).encode()
+
 
 def random_string(length: int = 32) -> str:
     """生成指定长度的安全随机字符串（字母+数字）。"""
-    alphabet = string.ascii_letters + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(length))
+    # 一次取一批随机字节，取低 6 位作为下标；丢弃 >= 62 的值（拒绝采样）
+    # 保证各字符等概率，同时避免逐字符调用系统随机源
+    out = bytearray()
+    while len(out) < length:
+        for b in secrets.token_bytes(length * 2):
+            v = b & 63
+            if v < len(_ALPHABET):
+                out.append(_ALPHABET[v])
+                if len(out) == length:
+                    break
+    return out.decode()
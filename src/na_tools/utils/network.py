@@ -1,11 +1,20 @@
 """网络请求工具，支持多源下载与重试。"""
 
-from pathlib import Path
+from __future__ import annotations
 
-import httpx
+import atexit
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from .console import error, info
 
+if TYPE_CHECKING:
+    import httpx
+
 # nekro-agent 资源的多个下载源
 BASE_URLS = [
     "https://raw.githubusercontent.com/KroMiose/nekro-agent/main/docker",
@@ -14,9 +23,41 @@ BASE_URLS = [
 
 TIMEOUT = 30.0
 
+# 流式写盘的分块大小，避免整个响应体驻留内存，同时减少小块写入次数
+CHUNK_SIZE = 1 << 16
+
+# download_many 同时下载的文件数上限
+_MAX_PARALLEL_FILES = 8
+
+# 进程内复用的 HTTP 客户端，多次下载共享连接池，避免重复 TLS 握手
+_client: httpx.Client | None = None
+# 并发下载可能同时首次取用客户端，创建过程需加锁
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # httpx 导入较重，只在真正发起下载时加载
+                import httpx
+
+                client = httpx.Client(
+                    timeout=TIMEOUT,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_keepalive_connections=4),
+                )
+                atexit.register(client.close)
+                _client = client
+    return _client
+
 
 def download_file(filename: str, output: Path) -> bool:
-    """从多个源尝试下载文件。
+    """从多个源同时下载文件，采用最先成功的结果。
+
+    各源并发请求，任一源下载完成后立即返回，不等待其余请求结束；
+    落选请求在后台自行中止并清理各自的临时文件。
 
     Args:
         filename: 远程文件名（相对于 BASE_URLS）。
@@ -26,22 +67,88 @@ def download_file(filename: str, output: Path) -> bool:
         下载是否成功。
     """
     output.parent.mkdir(parents=True, exist_ok=True)
+    info(f"正在下载 {filename} ...")
 
-    for base_url in BASE_URLS:
-        url = f"{base_url}/{filename}"
-        try:
-            info(f"正在下载 {filename} ...")
-            with httpx.Client(timeout=TIMEOUT, follow_redirects=True) as client:
-                with client.stream("GET", url) as resp:
-                    resp.raise_for_status()
-                    with open(output, "wb") as f:
-                        for chunk in resp.iter_bytes():
-                            f.write(chunk)
+    # 首个下载完成的请求获取该锁作为胜出者，其余请求见锁已占用即中止
+    winner = threading.Lock()
+    responses: list[httpx.Response] = []
+    executor = ThreadPoolExecutor(max_workers=len(BASE_URLS))
+    futures = {
+        executor.submit(
+            _download_one, f"{base_url}/{filename}", output, winner, responses
+        ): base_url
+        for base_url in BASE_URLS
+    }
+    try:
+        for future in as_completed(futures):
+            tmp = future.result()
+            if tmp is None:
+                info(f"从 {futures[future]} 下载失败，尝试其他源...")
+                continue
+            os.replace(tmp, output)
             return True
-        except httpx.HTTPError:
-            info(f"从 {base_url} 下载失败，尝试其他源...")
-            continue
+    finally:
+        _ = winner.acquire(blocking=False)
+        # 关闭落选请求的连接使其尽快中止；不等待它们退出，临时文件由各自线程删除
+        for resp in responses:
+            resp.close()
+        executor.shutdown(wait=False, cancel_futures=True)
 
     error(f"所有源均下载失败: {filename}")
     return False
 
+
+def download_many(files: list[tuple[str, Path]]) -> dict[str, bool]:
+    """并发下载多个文件，共享同一连接池。
+
+    Args:
+        files: ``(远程文件名, 本地保存路径)`` 列表。
+
+    Returns:
+        远程文件名到下载是否成功的映射。
+    """
+    if len(files) <= 1:
+        return {filename: download_file(filename, output) for filename, output in files}
+    with ThreadPoolExecutor(max_workers=min(len(files), _MAX_PARALLEL_FILES)) as executor:
+        results = executor.map(lambda pair: download_file(*pair), files)
+        return {filename: ok for (filename, _), ok in zip(files, results)}
+
+
+def _download_one(
+    url: str,
+    output: Path,
+    winner: threading.Lock,
+    responses: list[httpx.Response],
+) -> Path | None:
+    """下载到 output 同目录的临时文件，失败或被取消时返回 None。"""
+    import httpx
+
+    tmp: Path | None = None
+    try:
+        with _get_client().stream("GET", url) as resp:
+            responses.append(resp)
+            if winner.locked():
+                raise _Cancelled
+            resp.raise_for_status()
+            # 响应成功后才创建临时文件，失败的源不会在目标目录留下痕迹
+            fd, name = tempfile.mkstemp(prefix=f".{output.name}.", dir=output.parent)
+            tmp = Path(name)
+            with os.fdopen(fd, "wb") as f:
+                for chunk in resp.iter_bytes(chunk_size=CHUNK_SIZE):
+                    if winner.locked():
+                        raise _Cancelled
+                    f.write(chunk)
+        if not winner.acquire(blocking=False):
+            raise _Cancelled
+        return tmp
+    except Exception as exc:
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+        # 连接被胜出方关闭时，读取可能抛出任意异常，一律视为已取消
+        if isinstance(exc, (httpx.HTTPError, OSError, _Cancelled)) or winner.locked():
+            return None
+        raise
+
+
+class _Cancelled(Exception):
+    """其他源已下载成功，当前请求中止。"""
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import shutil
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from na_tools.utils import archive
+from na_tools.utils.archive import open_tar_gz_reader, open_tar_gz_writer
+
+
+def _write_sample(path: Path, source: Path) -> None:
+    with open_tar_gz_writer(path, compress_level=1) as tar:
+        tar.add(source, arcname="source")
+
+
+def test_tar_gz_writer_falls_back_to_tarfile_without_pigz_or_isal(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.txt").write_text("hello", encoding="utf-8")
+    monkeypatch.setattr("na_tools.utils.archive.shutil.which", lambda _name: None)
+    monkeypatch.setattr(archive, "igzip", None)
+
+    archive_path = tmp_path / "out.tar.gz"
+    _write_sample(archive_path, source)
+
+    with tarfile.open(archive_path, "r:gz") as tar:
+        assert tar.getnames() == ["source", "source/a.txt"]
+
+
+def test_tar_gz_writer_pipes_through_external_compressor(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    gzip_path = shutil.which("gzip")
+    if gzip_path is None:
+        pytest.skip("gzip not available")
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.txt").write_text("hello", encoding="utf-8")
+    # gzip 与 pigz 的 `-N -c` 参数兼容，用作替身
+    monkeypatch.setattr("na_tools.utils.archive.shutil.which", lambda _name: gzip_path)
+
+    archive_path = tmp_path / "out.tar.gz"
+    _write_sample(archive_path, source)
+
+    with tarfile.open(archive_path, "r:gz") as tar:
+        assert tar.getnames() == ["source", "source/a.txt"]
+        member = tar.extractfile("source/a.txt")
+        assert member is not None
+        assert member.read() == b"hello"
+
+
+def test_tar_gz_isal_round_trip(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    if archive.igzip is None:
+        pytest.skip("isal not installed")
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.txt").write_text("hello", encoding="utf-8")
+    monkeypatch.setattr("na_tools.utils.archive.shutil.which", lambda _name: None)
+
+    archive_path = tmp_path / "out.tar.gz"
+    _write_sample(archive_path, source)
+
+    with tarfile.open(archive_path, "r:gz") as tar:
+        assert tar.getnames() == ["source", "source/a.txt"]
+    with open_tar_gz_reader(archive_path) as tar:
+        assert tar.getnames() == ["source", "source/a.txt"]
+
+
+def test_tar_gz_writer_uses_gnu_format_for_long_and_unicode_names(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("na_tools.utils.archive.shutil.which", lambda _name: None)
+    source = tmp_path / "source"
+    nested = source / ("d" * 120) / "配置"
+    nested.mkdir(parents=True)
+    (nested / "插件.yaml").write_text("ok", encoding="utf-8")
+
+    archive_path = tmp_path / "out.tar.gz"
+    _write_sample(archive_path, source)
+
+    with open_tar_gz_reader(archive_path) as tar:
+        members = [(member.name, member.pax_headers) for member in tar]
+    assert members[-1] == (f"source/{'d' * 120}/配置/插件.yaml", {})
+
+
+def test_tar_gz_reader_pipes_through_external_decompressor(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    gzip_path = shutil.which("gzip")
+    if gzip_path is None:
+        pytest.skip("gzip not available")
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.txt").write_text("hello", encoding="utf-8")
+    archive_path = tmp_path / "out.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as tar:
+        tar.add(source, arcname="source")
+    # gzip 与 pigz 的 `-dc` 参数兼容，用作替身
+    monkeypatch.setattr("na_tools.utils.archive.shutil.which", lambda _name: gzip_path)
+    monkeypatch.setattr(archive, "igzip", None)
+
+    with open_tar_gz_reader(archive_path) as tar:
+        assert [member.name for member in tar] == ["source", "source/a.txt"]
+
+    # 破坏 gzip 尾部 CRC：数据可完整读出，但解压进程以非零退出码结束
+    data = bytearray(archive_path.read_bytes())
+    data[-8] ^= 0xFF
+    archive_path.write_bytes(bytes(data))
+    with pytest.raises(tarfile.ReadError):
+        with open_tar_gz_reader(archive_path) as tar:
+            for _member in tar:
+                pass
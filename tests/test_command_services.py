@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import gzip
+import io
 import json
+import os
+import sys
 import tarfile
 from datetime import datetime
 from pathlib import Path
+from typing import IO
 
 import pytest
 
@@ -21,8 +26,14 @@ from na_tools.services.napcat_service import (
     NapcatService,
     build_onebot_config,
 )
+from na_tools.services import restore_service
+from na_tools.services.common import ServiceEvent
 from na_tools.services.remove_service import RemoveRequest, RemoveService
-from na_tools.services.restore_service import RestoreRequest, RestoreService
+from na_tools.services.restore_service import (
+    RestoreRequest,
+    RestoreService,
+    RestoreServiceError,
+)
 
 
 class FakeBackupDocker:
@@ -44,6 +55,79 @@ class FakeBackupDocker:
         return True
 
 
+class FakeVolumeBackupDocker:
+    compose_installed = True
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, list[str], dict[str, str]]] = []
+        self.downs = 0
+        self.ups = 0
+
+    def down(self, cwd: Path, env_file: Path | None = None) -> bool:
+        self.downs += 1
+        return True
+
+    def up(self, cwd: Path, env_file: Path | None = None) -> bool:
+        self.ups += 1
+        return True
+
+    def get_compose_config(
+        self, cwd: Path, env_file: Path | None = None
+    ) -> dict[str, object] | None:
+        return {"services": {"nekro_postgres": {}, "nekro_qdrant": {}, "nekro_agent": {}}}
+
+    def get_service_volumes(
+        self,
+        cwd: Path,
+        services: list[str],
+        env_file: Path | None = None,
+    ) -> dict[str, dict[str, str]]:
+        return {
+            "nekro_postgres": {"/var/lib/postgresql/data": "na_pg"},
+            "nekro_qdrant": {"/qdrant/storage": "na_qd"},
+        }
+
+    def run_ephemeral(
+        self,
+        image: str,
+        cmd: list[str],
+        volumes: dict[str, str],
+        workdir: str | None = None,
+    ) -> bool:
+        self.calls.append((image, cmd, volumes))
+        backup_dir = next(src for src, dst in volumes.items() if dst == "/backup")
+        for filename in cmd[5:]:
+            (Path(backup_dir) / filename).write_bytes(b"volume")
+        return True
+
+
+class FakeVolumeRestoreDocker(FakeVolumeBackupDocker):
+    def __init__(self) -> None:
+        super().__init__()
+        self.restored: dict[str, tuple[list[str], bytes]] = {}
+
+    def compose(
+        self,
+        *args: str,
+        cwd: Path | None = None,
+        env_file: Path | None = None,
+        check: bool = True,
+        capture: bool = False,
+    ) -> object:
+        return object()
+
+    def run_ephemeral_stdin(
+        self,
+        image: str,
+        cmd: list[str],
+        stdin: IO[bytes],
+        volumes: dict[str, str],
+    ) -> bool:
+        assert list(volumes.values()) == ["/data"]
+        self.restored[next(iter(volumes))] = (cmd, stdin.read())
+        return True
+
+
 class FakeRemoveDocker:
     compose_installed = False
 
@@ -177,8 +261,14 @@ def _patch_install_io(monkeypatch: pytest.MonkeyPatch) -> None:
         )
         return env_path
 
-    def fake_download_compose(data_dir: Path, *, with_napcat: bool) -> bool:
-        data_dir.joinpath("docker-compose.yml").write_text(
+    def fake_download_compose(
+        data_dir: Path,
+        *,
+        with_napcat: bool,
+        with_env_example: bool = False,
+        output: Path | None = None,
+    ) -> bool:
+        (output or data_dir / "docker-compose.yml").write_text(
             "services:\n  nekro_agent:\n    image: kromiose/nekro-agent:latest\n",
             encoding="utf-8",
         )
@@ -225,6 +315,91 @@ def test_backup_service_creates_named_backup_and_skips_cache(tmp_path: Path) ->
     assert "nekro_data/logs/skip.log" not in names
 
 
+def test_backup_service_prunes_cache_dirs_and_keeps_nested_entries(tmp_path: Path) -> None:
+    data_dir = tmp_path / "nekro_data"
+    temp_dir = data_dir / "napcat_data" / "QQ" / "nt_qq" / "u1" / "nt_temp"
+    temp_dir.mkdir(parents=True)
+    (temp_dir / "a.tmp").write_text("tmp", encoding="utf-8")
+    (temp_dir / "b.tmp").write_text("tmp", encoding="utf-8")
+    nested = data_dir / "configs" / "plugins"
+    nested.mkdir(parents=True)
+    (nested / "p.yaml").write_text("p", encoding="utf-8")
+    (data_dir / "configs_link").symlink_to("configs")
+
+    result = BackupService(
+        docker_factory=FakeBackupDocker,
+        config_dir_getter=lambda: tmp_path / "config",
+    ).run(BackupRequest(data_dir=data_dir))
+
+    assert result.skipped_cache == 1
+    with tarfile.open(result.backup_path, "r:gz") as tar:
+        members = {member.name: member for member in tar.getmembers()}
+    assert "nekro_data/configs/plugins/p.yaml" in members
+    assert "nekro_data/napcat_data/QQ/nt_qq/u1" in members
+    assert not any("nt_temp" in name for name in members)
+    assert members["nekro_data/configs_link"].issym()
+    assert "nekro_data/configs_link/plugins" not in members
+
+
+def test_backup_service_lists_newest_backups_first(tmp_path: Path) -> None:
+    data_dir = tmp_path / "nekro_data"
+    config_dir = tmp_path / "config"
+    backup_dir = config_dir / "backup" / data_dir.name
+    backup_dir.mkdir(parents=True)
+    names = [
+        "nekro_data_backup_manual_20260101_000000.tar.gz",
+        "nekro_data_backup_20260102_000000.tar.gz",
+        "nekro_data_backup_manual_20260103_000000.tar.gz",
+        "notes.txt",
+    ]
+    for offset, filename in enumerate(names):
+        path = backup_dir / filename
+        path.write_text(filename, encoding="utf-8")
+        os.utime(path, (1_700_000_000 + offset, 1_700_000_000 + offset))
+
+    service = BackupService(config_dir_getter=lambda: config_dir)
+
+    all_backups = service.list_backups(data_dir)
+    manual = service.list_backups(data_dir, name="manual", limit=1)
+
+    assert [item.path.name for item in all_backups] == names[2::-1]
+    assert [item.path.name for item in manual] == [names[2]]
+    assert manual[0].size_bytes == len(names[2])
+
+
+def test_backup_service_archives_compose_volumes(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    data_dir = tmp_path / "nekro_data"
+    data_dir.mkdir()
+    (data_dir / "docker-compose.yml").write_text("services: {}\n", encoding="utf-8")
+    monkeypatch.setattr("na_tools.services.backup_service.resolve_mirror", lambda _env: "")
+    docker = FakeVolumeBackupDocker()
+
+    result = BackupService(
+        docker_factory=lambda: docker,
+        config_dir_getter=lambda: tmp_path / "config",
+    ).run(BackupRequest(data_dir=data_dir, compress_level=1))
+
+    assert docker.downs == 1
+    assert docker.ups == 1
+    assert len(docker.calls) == 1
+    _image, cmd, volumes = docker.calls[0]
+    assert cmd[4:] == ["1", "postgres.tar.gz", "qdrant.tar.gz"]
+    assert volumes["na_pg"] == "/data_0"
+    assert volumes["na_qd"] == "/data_1"
+    staging_dir = next(src for src, dst in volumes.items() if dst == "/backup")
+    assert Path(staging_dir).parent == tmp_path
+    assert not Path(staging_dir).exists()
+    assert [path.name for path in result.volume_backups] == ["postgres.tar.gz", "qdrant.tar.gz"]
+    with tarfile.open(result.backup_path, "r:gz") as tar:
+        names = tar.getnames()
+    assert "volumes/postgres.tar.gz" in names
+    assert "volumes/qdrant.tar.gz" in names
+    assert not any("volumes_backup_tmp" in name for name in names)
+
+
 def test_install_service_registers_and_starts_daemon_by_default(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
@@ -262,6 +437,22 @@ def test_install_service_can_skip_daemon_registration(
     assert result.daemon_service is None
 
 
+def test_install_service_cancel_after_env_leaves_no_compose_file(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _patch_install_io(monkeypatch)
+    data_dir = tmp_path / "nekro_data"
+
+    with pytest.raises(InstallServiceError) as raised:
+        InstallService(docker_factory=FakeInstallDocker).run(
+            InstallRequest(data_dir=data_dir, continue_after_env=lambda: False)
+        )
+
+    assert raised.value.code == "install_cancelled"
+    assert sorted(path.name for path in data_dir.iterdir()) == [".env"]
+
+
 def test_install_service_daemon_failure_aborts_install(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
@@ -296,6 +487,208 @@ def test_restore_service_restores_archive_without_starting_service(tmp_path: Pat
     assert result.service_started is False
 
 
+def test_restore_service_rejects_non_gzip_file(tmp_path: Path) -> None:
+    backup = tmp_path / "backup.tar.gz"
+    with tarfile.open(backup, "w") as tar:
+        tar.addfile(tarfile.TarInfo("nekro_data"))
+
+    with pytest.raises(RestoreServiceError) as raised:
+        RestoreService(docker_factory=FakeBackupDocker).run(
+            RestoreRequest(backup_file=backup, data_dir=tmp_path / "target")
+        )
+
+    assert raised.value.code == "invalid_backup"
+
+
+def test_restore_service_reports_corrupt_gzip_as_invalid_backup(tmp_path: Path) -> None:
+    backup = tmp_path / "backup.tar.gz"
+    backup.write_bytes(gzip.compress(b"not a tar archive" * 64))
+
+    with pytest.raises(RestoreServiceError) as raised:
+        RestoreService(docker_factory=FakeBackupDocker).run(
+            RestoreRequest(backup_file=backup, data_dir=tmp_path / "target")
+        )
+
+    assert raised.value.code == "invalid_backup"
+
+
+def test_restore_service_replaces_existing_children_in_one_pass(tmp_path: Path) -> None:
+    source = tmp_path / "nekro_data"
+    (source / "configs").mkdir(parents=True)
+    (source / "configs" / "app.yaml").write_text("new", encoding="utf-8")
+    (source / "data.bin").write_text("payload", encoding="utf-8")
+    volume_file = tmp_path / "postgres.tar.gz"
+    volume_file.write_bytes(b"volume")
+    backup = tmp_path / "backup.tar.gz"
+    with tarfile.open(backup, "w:gz") as tar:
+        tar.add(source, arcname="nekro_data")
+        link = tarfile.TarInfo("nekro_data/data.link")
+        link.type = tarfile.LNKTYPE
+        link.linkname = "nekro_data/data.bin"
+        tar.addfile(link)
+        tar.add(volume_file, arcname="volumes/postgres.tar.gz")
+
+    target = tmp_path / "target"
+    (target / "configs").mkdir(parents=True)
+    (target / "configs" / "stale.yaml").write_text("old", encoding="utf-8")
+    (target / "untouched.txt").write_text("keep", encoding="utf-8")
+
+    result = RestoreService(docker_factory=FakeBackupDocker).run(
+        RestoreRequest(backup_file=backup, data_dir=target, start_service=False)
+    )
+
+    assert (target / "configs" / "app.yaml").read_text(encoding="utf-8") == "new"
+    assert not (target / "configs" / "stale.yaml").exists()
+    assert (target / "untouched.txt").read_text(encoding="utf-8") == "keep"
+    assert (target / "data.link").read_text(encoding="utf-8") == "payload"
+    assert not (target / "volumes").exists()
+    assert sorted(path.name for path in target.iterdir()) == [
+        "configs",
+        "data.bin",
+        "data.link",
+        "untouched.txt",
+    ]
+    assert result.restored_volumes == ()
+
+
+def test_restore_service_retries_failed_parallel_removals(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    source = tmp_path / "nekro_data"
+    (source / "configs").mkdir(parents=True)
+    (source / "configs" / "app.yaml").write_text("new", encoding="utf-8")
+    backup = tmp_path / "backup.tar.gz"
+    with tarfile.open(backup, "w:gz") as tar:
+        tar.add(source, arcname="nekro_data")
+
+    target = tmp_path / "target"
+    (target / "configs").mkdir(parents=True)
+    (target / "configs" / "stale.yaml").write_text("old", encoding="utf-8")
+
+    real_remove_path = restore_service._remove_path
+
+    def flaky_remove_path(path: Path) -> None:
+        # 只让线程池中对暂存子项的删除失败，暂存目录本身的同步删除照常进行
+        if path.parent.name.startswith(".na-restore-old-"):
+            raise PermissionError(path)
+        real_remove_path(path)
+
+    monkeypatch.setattr(restore_service, "_remove_path", flaky_remove_path)
+    events: list[ServiceEvent] = []
+
+    _ = RestoreService(docker_factory=FakeBackupDocker).run(
+        RestoreRequest(backup_file=backup, data_dir=target, start_service=False),
+        events.append,
+    )
+
+    assert (target / "configs" / "app.yaml").read_text(encoding="utf-8") == "new"
+    assert [path.name for path in target.iterdir()] == ["configs"]
+    assert any(
+        event.level == "warning" and "旧文件删除失败" in event.message for event in events
+    )
+
+
+def _populated_restore_target(tmp_path: Path) -> Path:
+    target = tmp_path / "target"
+    (target / "configs").mkdir(parents=True)
+    (target / "configs" / "old.yaml").write_text("old", encoding="utf-8")
+    (target / "zbig.bin").write_text("old-big", encoding="utf-8")
+    return target
+
+
+def _assert_restore_target_untouched(target: Path) -> None:
+    assert (target / "configs" / "old.yaml").read_text(encoding="utf-8") == "old"
+    assert not (target / "configs" / "new.yaml").exists()
+    assert (target / "zbig.bin").read_text(encoding="utf-8") == "old-big"
+    assert not [path.name for path in target.iterdir() if path.name.startswith(".na-restore-old-")]
+
+
+def test_restore_service_truncated_archive_keeps_existing_children(tmp_path: Path) -> None:
+    source = tmp_path / "nekro_data"
+    (source / "configs").mkdir(parents=True)
+    (source / "configs" / "new.yaml").write_text("new", encoding="utf-8")
+    (source / "zbig.bin").write_bytes(os.urandom(4 << 20))
+    backup = tmp_path / "backup.tar.gz"
+    with tarfile.open(backup, "w:gz") as tar:
+        tar.add(source, arcname="nekro_data")
+    backup.write_bytes(backup.read_bytes()[: backup.stat().st_size * 3 // 4])
+    target = _populated_restore_target(tmp_path)
+
+    with pytest.raises(RestoreServiceError) as raised:
+        RestoreService(docker_factory=FakeBackupDocker).run(
+            RestoreRequest(backup_file=backup, data_dir=target, start_service=False)
+        )
+
+    assert raised.value.code == "invalid_backup"
+    _assert_restore_target_untouched(target)
+
+
+def test_restore_service_truncated_archive_leaves_no_partial_files(tmp_path: Path) -> None:
+    source = tmp_path / "nekro_data"
+    source.mkdir()
+    (source / ".env").write_text("NEKRO_EXPOSE_PORT=8021\n", encoding="utf-8")
+    (source / "zbig.bin").write_bytes(os.urandom(4 << 20))
+    backup = tmp_path / "backup.tar.gz"
+    with tarfile.open(backup, "w:gz") as tar:
+        tar.add(source, arcname="nekro_data")
+    backup.write_bytes(backup.read_bytes()[: backup.stat().st_size * 3 // 4])
+    target = tmp_path / "target"
+    target.mkdir()
+    (target / "keep.txt").write_text("keep", encoding="utf-8")
+
+    with pytest.raises(RestoreServiceError) as raised:
+        RestoreService(docker_factory=FakeBackupDocker).run(
+            RestoreRequest(backup_file=backup, data_dir=target, start_service=False)
+        )
+
+    assert raised.value.code == "invalid_backup"
+    assert [path.name for path in target.iterdir()] == ["keep.txt"]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="extraction filters need Python 3.12+")
+def test_restore_service_filtered_member_keeps_existing_children(tmp_path: Path) -> None:
+    backup = tmp_path / "backup.tar.gz"
+    with tarfile.open(backup, "w:gz") as tar:
+        for name, payload in (("configs/new.yaml", b"new"), ("zbig.bin", b"new-big")):
+            info = tarfile.TarInfo(f"nekro_data/{name}")
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+        escape = tarfile.TarInfo("nekro_data/zlink")
+        escape.type = tarfile.SYMTYPE
+        escape.linkname = "/etc/passwd"
+        tar.addfile(escape)
+    target = _populated_restore_target(tmp_path)
+
+    with pytest.raises(RestoreServiceError) as raised:
+        RestoreService(docker_factory=FakeBackupDocker).run(
+            RestoreRequest(backup_file=backup, data_dir=target, start_service=False)
+        )
+
+    assert raised.value.code == "invalid_backup"
+    _assert_restore_target_untouched(target)
+
+
+def test_restore_service_pipes_volume_archives_into_containers(tmp_path: Path) -> None:
+    source = tmp_path / "nekro_data"
+    source.mkdir()
+    (source / "docker-compose.yml").write_text("services: {}\n", encoding="utf-8")
+    volume_file = tmp_path / "postgres.tar.gz"
+    volume_file.write_bytes(b"pg-volume")
+    backup = tmp_path / "backup.tar.gz"
+    with tarfile.open(backup, "w:gz") as tar:
+        tar.add(source, arcname="nekro_data")
+        tar.add(volume_file, arcname="volumes/postgres.tar.gz")
+    docker = FakeVolumeRestoreDocker()
+
+    result = RestoreService(docker_factory=lambda: docker).run(
+        RestoreRequest(backup_file=backup, data_dir=tmp_path / "target", start_service=False)
+    )
+
+    assert result.restored_volumes == ("na_pg",)
+    assert docker.restored == {"na_pg": (["tar", "xzf", "-", "-C", "/data"], b"pg-volume")}
+
+
 def test_remove_service_unmanaged_keep_data(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     data_dir = tmp_path / "nekro_data"
     data_dir.mkdir()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from na_tools.core.compose import set_image_tag, update_compose_images
+
+
+def test_update_compose_images_applies_mirror_and_tag(tmp_path: Path) -> None:
+    compose_path = tmp_path / "docker-compose.yml"
+    compose_path.write_text(
+        "services:\n"
+        "  nekro_agent:\n"
+        "    image: kromiose/nekro-agent:latest\n"
+        "  nekro_postgres:\n"
+        "    image: postgres:14\n",
+        encoding="utf-8",
+    )
+
+    matched = update_compose_images(
+        tmp_path,
+        mirror="https://docker.1ms.run/",
+        image_tag=("kromiose/nekro-agent", "preview"),
+    )
+
+    assert matched is True
+    assert compose_path.read_text(encoding="utf-8") == (
+        "services:\n"
+        "  nekro_agent:\n"
+        "    image: docker.1ms.run/kromiose/nekro-agent:preview\n"
+        "  nekro_postgres:\n"
+        "    image: docker.1ms.run/postgres:14\n"
+    )
+    assert update_compose_images(tmp_path, image_tag=("missing/image", "latest")) is False
+
+
+def test_update_compose_images_keeps_comments_and_quotes(tmp_path: Path) -> None:
+    compose_path = tmp_path / "docker-compose.yml"
+    compose_path.write_text(
+        "# Nekro Agent\n"
+        "services:\n"
+        "  nekro_agent:\n"
+        '    image: "kromiose/nekro-agent:latest"  # main\n'
+        "  nekro_qdrant:\n"
+        "    image: 'docker.1ms.run/qdrant/qdrant'\n",
+        encoding="utf-8",
+    )
+
+    assert update_compose_images(tmp_path, mirror="docker.1ms.run") is True
+    assert compose_path.read_text(encoding="utf-8") == (
+        "# Nekro Agent\n"
+        "services:\n"
+        "  nekro_agent:\n"
+        '    image: "docker.1ms.run/kromiose/nekro-agent:latest"  # main\n'
+        "  nekro_qdrant:\n"
+        "    image: 'docker.1ms.run/qdrant/qdrant'\n"
+    )
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes only")
+def test_set_image_tag_keeps_file_mode(tmp_path: Path) -> None:
+    compose_path = tmp_path / "docker-compose.yml"
+    compose_path.write_text(
+        "services:\n  nekro_agent:\n    image: kromiose/nekro-agent:latest\n",
+        encoding="utf-8",
+    )
+    compose_path.chmod(0o644)
+
+    assert set_image_tag(tmp_path, "kromiose/nekro-agent", "preview") is True
+
+    assert "kromiose/nekro-agent:preview" in compose_path.read_text(encoding="utf-8")
+    assert stat.S_IMODE(compose_path.stat().st_mode) == 0o644
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from na_tools.core.config import load_env, save_env
+
+
+def test_load_env_returns_independent_copies(tmp_path: Path) -> None:
+    env_path = tmp_path / ".env"
+    env_path.write_text("# comment\nNEKRO_EXPOSE_PORT = 8021\n\nINVALID\n", encoding="utf-8")
+
+    first = load_env(env_path)
+    first["NEKRO_EXPOSE_PORT"] = "9999"
+
+    assert load_env(env_path) == {"NEKRO_EXPOSE_PORT": "8021"}
+
+
+def test_load_env_sees_saved_and_external_changes(tmp_path: Path) -> None:
+    env_path = tmp_path / ".env"
+    save_env(env_path, {"INSTANCE_NAME": "a"})
+    assert load_env(env_path) == {"INSTANCE_NAME": "a"}
+
+    save_env(env_path, {"INSTANCE_NAME": "b"})
+    assert load_env(env_path) == {"INSTANCE_NAME": "b"}
+
+    env_path.write_text("INSTANCE_NAME=c\nEXTRA=1\n", encoding="utf-8")
+    assert load_env(env_path) == {"INSTANCE_NAME": "c", "EXTRA": "1"}
+
+
+def test_load_env_missing_file_returns_empty(tmp_path: Path) -> None:
+    assert load_env(tmp_path / ".env") == {}
+
+
+def test_save_env_skips_unchanged_and_appends_new_keys(tmp_path: Path) -> None:
+    env_path = tmp_path / ".env"
+    env_path.write_text("# header\nA=1\nB=2", encoding="utf-8")
+
+    save_env(env_path, {"A": "1"})
+    assert env_path.read_text(encoding="utf-8") == "# header\nA=1\nB=2"
+
+    save_env(env_path, {"C": "3"})
+    assert env_path.read_text(encoding="utf-8") == "# header\nA=1\nB=2\nC=3\n"
+
+    save_env(env_path, {"A": "10", "D": "4"})
+    assert env_path.read_text(encoding="utf-8") == "# header\nA=10\nB=2\nC=3\nD=4\n"
+    assert load_env(env_path) == {"A": "10", "B": "2", "C": "3", "D": "4"}
+
+
+def test_load_env_parses_like_stripped_lines(tmp_path: Path) -> None:
+    env_path = tmp_path / ".env"
+    env_path.write_text(
+        "  # comment=ignored\r\n"
+        "\tKEY = value with = sign \r\n"
+        "NO_EQUALS\n"
+        "EMPTY=\n"
+        "a#b=c\n"
+        "KEY=last wins\n",
+        encoding="utf-8",
+    )
+
+    assert load_env(env_path) == {"KEY": "last wins", "EMPTY": "", "a#b": "c"}
+
+
+def test_load_env_splits_on_all_line_boundaries(tmp_path: Path) -> None:
+    env_path = tmp_path / ".env"
+    env_path.write_text(
+        "A=1\rB=2\x0cC=3\x85D=4\u2028E=5\u2029F=6",
+        encoding="utf-8",
+        newline="",
+    )
+
+    assert load_env(env_path) == {"A": "1", "B": "2", "C": "3", "D": "4", "E": "5", "F": "6"}
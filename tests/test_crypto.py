@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import string
+
+from na_tools.utils.crypto import random_string
+
+
+def test_random_string_length_and_alphabet() -> None:
+    alphabet = set(string.ascii_letters + string.digits)
+    for length in (0, 1, 16, 32, 257):
+        value = random_string(length)
+        assert len(value) == length
+        assert set(value) <= alphabet
+
+
+def test_random_string_covers_whole_alphabet() -> None:
+    assert set(random_string(20000)) == set(string.ascii_letters + string.digits)
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from na_tools.core.docker import DockerEnv, refresh_docker_detection
+
+
+def _completed(cmd: list[str], stdout: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+
+def test_get_service_volumes_uses_one_ps_and_one_inspect(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("na_tools.core.docker._find_docker", lambda: "/usr/bin/docker")
+    monkeypatch.setattr(
+        "na_tools.core.docker._detect_compose_cmd",
+        lambda: ["/usr/bin/docker", "compose"],
+    )
+    docker = DockerEnv()
+    calls: list[list[str]] = []
+
+    def fake_run_cmd(cmd: list[str], **_kwargs: object) -> subprocess.CompletedProcess[str]:
+        calls.append(cmd)
+        if cmd[:2] == ["/usr/bin/docker", "compose"]:
+            return _completed(cmd, "aaa\nbbb\n")
+        return _completed(
+            cmd,
+            'nekro_postgres [{"Type":"volume","Name":"na_pg","Destination":"/var/lib/postgresql/data"}]\n'
+            'nekro_qdrant [{"Type":"bind","Source":"/x","Destination":"/qdrant/config"},'
+            '{"Type":"volume","Name":"na_qd","Destination":"/qdrant/storage"}]\n',
+        )
+
+    monkeypatch.setattr("na_tools.core.docker.run_cmd", fake_run_cmd)
+
+    volumes = docker.get_service_volumes(tmp_path, ["nekro_postgres", "nekro_qdrant"])
+
+    assert volumes == {
+        "nekro_postgres": {"/var/lib/postgresql/data": "na_pg"},
+        "nekro_qdrant": {"/qdrant/storage": "na_qd"},
+    }
+    assert len(calls) == 2
+    assert calls[0][-2:] == ["nekro_postgres", "nekro_qdrant"]
+    assert calls[1][-2:] == ["aaa", "bbb"]
+
+
+def test_run_ephemeral_stdin_streams_into_container(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    fake_docker = tmp_path / "docker"
+    fake_docker.write_text('#!/bin/sh\ncat > "$NA_TEST_OUT"\n', encoding="utf-8")
+    fake_docker.chmod(0o755)
+    out = tmp_path / "stdin.bin"
+    monkeypatch.setenv("NA_TEST_OUT", str(out))
+    monkeypatch.setattr("na_tools.core.docker._find_docker", lambda: str(fake_docker))
+    monkeypatch.setattr("na_tools.core.docker._detect_compose_cmd", lambda: None)
+    payload = tmp_path / "volume.tar.gz"
+    payload.write_bytes(b"x" * (3 << 20))
+
+    with payload.open("rb") as stream:
+        ok = DockerEnv().run_ephemeral_stdin(
+            "alpine:latest",
+            ["tar", "xzf", "-", "-C", "/data"],
+            stream,
+            {"na_pg": "/data"},
+        )
+
+    assert ok is True
+    assert out.read_bytes() == payload.read_bytes()
+
+
+def test_docker_detection_is_cached_per_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    probes: list[list[str]] = []
+
+    def fake_run_cmd(cmd: list[str], **_kwargs: object) -> subprocess.CompletedProcess[str]:
+        probes.append(cmd)
+        return _completed(cmd, "Docker Compose version v2")
+
+    monkeypatch.setattr("na_tools.core.docker.run_cmd", fake_run_cmd)
+    monkeypatch.setattr(
+        "na_tools.core.docker.shutil.which",
+        lambda name, path=None: f"/opt/bin/{name}",
+    )
+    monkeypatch.setenv("PATH", "/opt/bin")
+    refresh_docker_detection()
+    try:
+        first = DockerEnv()
+        second = DockerEnv()
+        assert first.compose_cmd == ["/opt/bin/docker", "compose"]
+        assert second.docker_path == "/opt/bin/docker"
+        assert len(probes) == 1
+
+        monkeypatch.setenv("PATH", "/opt/bin:/usr/local/bin")
+        _ = DockerEnv()
+        refresh_docker_detection()
+        _ = DockerEnv()
+        assert len(probes) == 3
+    finally:
+        refresh_docker_detection()
+
+
+def test_print_status_queries_versions_independently(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setattr("na_tools.core.docker._find_docker", lambda: "/usr/bin/docker")
+    monkeypatch.setattr(
+        "na_tools.core.docker._detect_compose_cmd",
+        lambda: ["/usr/bin/docker", "compose"],
+    )
+    calls: list[list[str]] = []
+
+    def fake_run_cmd(cmd: list[str], **_kwargs: object) -> subprocess.CompletedProcess[str]:
+        calls.append(cmd)
+        if cmd[-1] == "version":
+            raise subprocess.CalledProcessError(1, cmd)
+        return _completed(cmd, "Docker version 27.0.0\n")
+
+    monkeypatch.setattr("na_tools.core.docker.run_cmd", fake_run_cmd)
+
+    DockerEnv().print_status()
+
+    out = capsys.readouterr().out
+    assert sorted(calls) == [
+        ["/usr/bin/docker", "--version"],
+        ["/usr/bin/docker", "compose", "version"],
+    ]
+    assert "Docker 已安装: Docker version 27.0.0" in out
+    assert "Docker Compose 已安装" in out
+
+
+def test_refresh_redetects_after_install(monkeypatch: pytest.MonkeyPatch) -> None:
+    installed: dict[str, str] = {}
+    monkeypatch.setattr(
+        "na_tools.core.docker.shutil.which",
+        lambda name, path=None: installed.get(name),
+    )
+    monkeypatch.setattr(
+        "na_tools.core.docker.run_cmd",
+        lambda cmd, **_kwargs: _completed(cmd, "Docker Compose version v2"),
+    )
+    refresh_docker_detection()
+    try:
+        docker = DockerEnv()
+        assert not docker.docker_installed
+
+        installed["docker"] = "/usr/bin/docker"
+        docker.refresh()
+
+        assert docker.docker_path == "/usr/bin/docker"
+        assert docker.compose_cmd == ["/usr/bin/docker", "compose"]
+    finally:
+        refresh_docker_detection()
+
+
+def test_docker_detection_does_not_keep_misses(monkeypatch: pytest.MonkeyPatch) -> None:
+    installed: dict[str, str] = {}
+    monkeypatch.setattr(
+        "na_tools.core.docker.shutil.which",
+        lambda name, path=None: installed.get(name),
+    )
+    monkeypatch.setattr(
+        "na_tools.core.docker.run_cmd",
+        lambda cmd, **_kwargs: _completed(cmd, "Docker Compose version v2"),
+    )
+    refresh_docker_detection()
+    try:
+        assert not DockerEnv().docker_installed
+
+        installed["docker"] = "/usr/bin/docker"
+        docker = DockerEnv()
+
+        assert docker.docker_path == "/usr/bin/docker"
+        assert docker.compose_cmd == ["/usr/bin/docker", "compose"]
+    finally:
+        refresh_docker_detection()
+
+
+def test_docker_detection_without_path_uses_which_default(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    searched: list[str | None] = []
+
+    def fake_which(name: str, path: str | None = None) -> str | None:
+        searched.append(path)
+        return f"/usr/bin/{name}"
+
+    monkeypatch.setattr("na_tools.core.docker.shutil.which", fake_which)
+    monkeypatch.setattr(
+        "na_tools.core.docker.run_cmd",
+        lambda cmd, **_kwargs: _completed(cmd, "Docker Compose version v2"),
+    )
+    monkeypatch.delenv("PATH", raising=False)
+    refresh_docker_detection()
+    try:
+        assert DockerEnv().docker_path == "/usr/bin/docker"
+        # 未设置 PATH 时交给 shutil.which 回退到 os.defpath，而不是搜索空路径
+        assert searched == [None]
+    finally:
+        refresh_docker_detection()
+
+
+def test_run_ephemeral_stdin_propagates_source_errors_and_reaps_container(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    fake_docker = tmp_path / "docker"
+    fake_docker.write_text("#!/bin/sh\ncat > /dev/null\nexec sleep 30\n", encoding="utf-8")
+    fake_docker.chmod(0o755)
+    monkeypatch.setattr("na_tools.core.docker._find_docker", lambda: str(fake_docker))
+    monkeypatch.setattr("na_tools.core.docker._detect_compose_cmd", lambda: None)
+    procs: list[subprocess.Popen[bytes]] = []
+    real_popen = subprocess.Popen
+
+    def tracking_popen(*args: object, **kwargs: object) -> subprocess.Popen[bytes]:
+        proc = real_popen(*args, **kwargs)  # type: ignore[call-overload]
+        procs.append(proc)
+        return proc
+
+    monkeypatch.setattr("na_tools.core.docker.subprocess.Popen", tracking_popen)
+    corrupt = io.BytesIO(gzip.compress(os.urandom(1 << 20))[:-64])
+
+    with pytest.raises((EOFError, gzip.BadGzipFile)):
+        DockerEnv().run_ephemeral_stdin(
+            "alpine:latest",
+            ["tar", "xzf", "-", "-C", "/data"],
+            gzip.GzipFile(fileobj=corrupt),
+            {"na_pg": "/data"},
+        )
+
+    assert len(procs) == 1
+    assert procs[0].returncode is not None
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from na_tools.core.na_config import (
+    config_path,
+    get_nested,
+    load_na_config,
+    save_na_config,
+    set_model_group,
+    set_nested,
+)
+
+
+def test_load_na_config_returns_independent_copies(tmp_path: Path) -> None:
+    save_na_config(tmp_path, {"system": {"SUPER_USERS": ["10001"]}})
+
+    first = load_na_config(tmp_path)
+    first["system"] = {}
+    second = load_na_config(tmp_path)
+
+    assert second == {"system": {"SUPER_USERS": ["10001"]}}
+
+
+def test_load_na_config_sees_saved_and_external_changes(tmp_path: Path) -> None:
+    save_na_config(tmp_path, {"MODEL_GROUPS": {"default": {"CHAT_MODEL": "a"}}})
+    assert load_na_config(tmp_path)["MODEL_GROUPS"] == {"default": {"CHAT_MODEL": "a"}}
+
+    save_na_config(tmp_path, {"MODEL_GROUPS": {"default": {"CHAT_MODEL": "b"}}})
+    assert load_na_config(tmp_path)["MODEL_GROUPS"] == {"default": {"CHAT_MODEL": "b"}}
+
+    config_path(tmp_path).write_text("MODEL_GROUPS: {}\nextra: true\n", encoding="utf-8")
+    assert load_na_config(tmp_path) == {"MODEL_GROUPS": {}, "extra": True}
+
+
+def test_load_na_config_missing_file_returns_empty(tmp_path: Path) -> None:
+    assert load_na_config(tmp_path) == {}
+
+
+def test_get_and_set_nested_share_dotted_paths() -> None:
+    data: dict[str, object] = {}
+
+    set_nested(data, "MODEL_GROUPS.default.API_KEY", "sk-1")
+    set_nested(data, "MODEL_GROUPS.default.API_KEY", "sk-2")
+
+    assert get_nested(data, "MODEL_GROUPS.default.API_KEY") == "sk-2"
+    assert get_nested(data, "MODEL_GROUPS.other.API_KEY") is None
+
+
+def test_set_model_group_repairs_invalid_sections() -> None:
+    data: dict[str, object] = {"system": {"MODEL_GROUPS": "broken"}}
+
+    set_model_group(data, "default", base_url="https://api", api_key="sk", model="m", TEMPERATURE=0.5)
+
+    assert data == {
+        "system": {
+            "MODEL_GROUPS": {
+                "default": {
+                    "BASE_URL": "https://api",
+                    "API_KEY": "sk",
+                    "CHAT_MODEL": "m",
+                    "TEMPERATURE": 0.5,
+                }
+            }
+        }
+    }
+
+
+def test_save_na_config_round_trips_unicode(tmp_path: Path) -> None:
+    save_na_config(tmp_path, {"system": {"BOT_NAME": "可洛喵"}})
+
+    assert "BOT_NAME: 可洛喵" in config_path(tmp_path).read_text(encoding="utf-8")
+    assert load_na_config(tmp_path) == {"system": {"BOT_NAME": "可洛喵"}}
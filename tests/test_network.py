@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import pytest
+
+from na_tools.utils import network
+
+_MIRRORS = ["https://slow.example/docker", "https://fast.example/docker"]
+
+
+def _use_transport(monkeypatch: pytest.MonkeyPatch, handler) -> None:
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(network, "_get_client", lambda: client)
+    monkeypatch.setattr(network, "BASE_URLS", _MIRRORS)
+
+
+def test_download_file_takes_first_successful_mirror(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "slow.example":
+            time.sleep(0.5)
+            return httpx.Response(200, content=b"slow")
+        return httpx.Response(200, content=b"fast")
+
+    _use_transport(monkeypatch, handler)
+    output = tmp_path / "docker-compose.yml"
+
+    started = time.monotonic()
+    assert network.download_file("docker-compose.yml", output) is True
+    assert time.monotonic() - started < 0.5
+
+    assert output.read_bytes() == b"fast"
+    # 落选的慢源在后台结束后自行删除临时文件
+    deadline = time.monotonic() + 5
+    while len(list(tmp_path.iterdir())) > 1 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert [p.name for p in tmp_path.iterdir()] == ["docker-compose.yml"]
+
+
+def test_download_file_falls_back_and_leaves_no_temp_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "fast.example":
+            return httpx.Response(404)
+        return httpx.Response(200, content=b"ok")
+
+    _use_transport(monkeypatch, handler)
+    output = tmp_path / ".env.example"
+
+    assert network.download_file(".env.example", output) is True
+
+    assert output.read_bytes() == b"ok"
+    assert [p.name for p in tmp_path.iterdir()] == [".env.example"]
+
+
+def test_download_file_all_mirrors_fail(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _use_transport(monkeypatch, lambda _request: httpx.Response(503))
+    output = tmp_path / "docker-compose.yml"
+
+    assert network.download_file("docker-compose.yml", output) is False
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_many_reports_each_file(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("missing.yml"):
+            return httpx.Response(404)
+        return httpx.Response(200, content=request.url.path.encode())
+
+    _use_transport(monkeypatch, handler)
+
+    results = network.download_many(
+        [
+            ("docker-compose.yml", tmp_path / "docker-compose.yml"),
+            (".env.example", tmp_path / ".env.example"),
+            ("missing.yml", tmp_path / "missing.yml"),
+        ]
+    )
+
+    assert results == {"docker-compose.yml": True, ".env.example": True, "missing.yml": False}
+    assert (tmp_path / ".env.example").read_bytes() == b"/docker/.env.example"
+    assert not (tmp_path / "missing.yml").exists()
+
+
+def test_get_client_is_shared_across_threads(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: list[object] = []
+    real_client = httpx.Client
+
+    def slow_client(**kwargs: object) -> httpx.Client:
+        time.sleep(0.05)
+        client = real_client(**kwargs)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(network, "_client", None)
+    monkeypatch.setattr(httpx, "Client", slow_client)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        clients = list(executor.map(lambda _: network._get_client(), range(4)))
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
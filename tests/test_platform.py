@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from na_tools.core import platform as na_platform
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(na_platform, "get_global_config_dir", lambda: tmp_path)
+    return tmp_path
+
+
+def test_load_global_config_returns_independent_copies(config_dir: Path) -> None:
+    na_platform.save_global_config({"installations": {"/srv/a": {"last_used": 1}}})
+
+    first = na_platform.load_global_config()
+    first["installations"] = {}
+
+    assert na_platform.load_global_config() == {"installations": {"/srv/a": {"last_used": 1}}}
+
+
+def test_load_global_config_sees_saved_and_external_changes(config_dir: Path) -> None:
+    assert na_platform.load_global_config() == {}
+
+    na_platform.set_global_mirror("docker.1ms.run")
+    assert na_platform.get_global_mirror() == "docker.1ms.run"
+
+    (config_dir / "config.json").write_text('{"current_data_dir": "/srv/nekro_b"}', encoding="utf-8")
+    assert na_platform.default_data_dir() == Path("/srv/nekro_b")
+
+    (config_dir / "config.json").write_text("not json", encoding="utf-8")
+    assert na_platform.load_global_config() == {}
+
+
+def test_run_cmd_inherits_environment_when_nothing_to_unset(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen: list[object] = []
+    monkeypatch.setattr(
+        na_platform.subprocess,
+        "run",
+        lambda cmd, **kwargs: seen.append(kwargs["env"]),
+    )
+    monkeypatch.setenv("NA_TEST_PRESENT", "1")
+    monkeypatch.delenv("NA_TEST_ABSENT", raising=False)
+
+    _ = na_platform.run_cmd(["true"], unset_keys={"NA_TEST_ABSENT"})
+    _ = na_platform.run_cmd(["true"], unset_keys={"NA_TEST_ABSENT", "NA_TEST_PRESENT"})
+
+    assert seen[0] is None
+    assert isinstance(seen[1], dict)
+    assert "NA_TEST_PRESENT" not in seen[1]